@@ -0,0 +1 @@
+"""Benchmarks of rotest_tklist."""
@@ -0,0 +1,67 @@
+"""Run all the benchmarks, printing a JSON result line for each scenario.
+
+Each line is tagged with the installed rotest-tklist version, so results of
+different versions can be compared line by line.
+
+Usage:
+    python -m benchmarks [--output FILE] [--quick]
+"""
+import io
+import sys
+import json
+import argparse
+from contextlib import redirect_stdout
+
+from benchmarks import (bench_import, bench_startup, bench_analysis,
+                        bench_memory, bench_durations)
+
+
+QUICK_ARGUMENTS = {
+    bench_import: ["--repeat", "1"],
+    bench_startup: ["--cases", "200", "--flows", "10", "--depth", "3"],
+    bench_analysis: ["--width", "50", "--depth", "4"],
+    bench_memory: ["--width", "50", "--depth", "4"],
+    bench_durations: ["--names", "40", "--latency", "0.001"],
+}
+
+
+def get_version():
+    """Return the installed version of rotest-tklist, or None."""
+    try:
+        import pkg_resources
+        return pkg_resources.get_distribution('rotest-tklist').version
+
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+def main(argv=None):
+    """Run the benchmarks and print their tagged result lines."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="file to write the results to")
+    parser.add_argument("--quick", action="store_true",
+                        help="run small suites, as a smoke test")
+    args = parser.parse_args(argv)
+
+    version = get_version()
+    lines = []
+    for module in QUICK_ARGUMENTS:
+        output = io.StringIO()
+        with redirect_stdout(output):
+            module.main(QUICK_ARGUMENTS[module] if args.quick else [])
+
+        for line in output.getvalue().splitlines():
+            result = json.loads(line)
+            result["version"] = version
+            lines.append(json.dumps(result, sort_keys=True))
+
+    text = "".join(line + "\n" for line in lines)
+    if args.output is not None:
+        with open(args.output, "w") as output_file:
+            output_file.write(text)
+
+    sys.stdout.write(text)
+
+
+if __name__ == '__main__':
+    main()
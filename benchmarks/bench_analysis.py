@@ -0,0 +1,78 @@
+"""Benchmark the connectivity analysis of wide and deeply nested flows.
+
+Times building the components data with finding the unconnected inputs
+(with the per-class caches cleared first), a cached analysis of the same
+flow, and creating the descriptions of all the components.
+
+Usage:
+    python -m benchmarks.bench_analysis [--width N] [--depth N]
+"""
+import sys
+import json
+import time
+import argparse
+
+from rotest_tklist.analysis import FlowComponentData
+
+from benchmarks.suites import make_wide_flow, make_deep_flow
+
+
+def clear_caches():
+    """Forget the cached analyses and interfaces of the flows' classes."""
+    FlowComponentData._ANALYSES.clear()
+    FlowComponentData._INTERFACES.clear()
+    FlowComponentData._UNCONNECTED.clear()
+
+
+def measure_flow(flow):
+    """Measure the analysis stages of a flow.
+
+    Args:
+        flow (type): flow class to analyze.
+
+    Returns:
+        dict. the number of components and the duration of each stage.
+    """
+    clear_caches()
+    start = time.time()
+    flow_data = FlowComponentData.analyze(flow)
+    analyze_time = time.time() - start
+
+    start = time.time()
+    FlowComponentData.analyze(flow)
+    cached_time = time.time() - start
+
+    components = list(flow_data.iterate())
+    start = time.time()
+    for component in components:
+        component.get_description()
+
+    description_time = time.time() - start
+    return {"components": len(components),
+            "analyze_time": round(analyze_time, 6),
+            "cached_analyze_time": round(cached_time, 6),
+            "description_time": round(description_time, 6)}
+
+
+def main(argv=None):
+    """Run the scenarios and print a JSON result line for each."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=500)
+    parser.add_argument("--depth", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    scenarios = [
+        ("wide", args.width, lambda: make_wide_flow(args.width)),
+        ("deep", args.depth, lambda: make_deep_flow(args.depth)),
+    ]
+    for scenario, size, make_flow in scenarios:
+        result = {"benchmark": "analysis",
+                  "scenario": scenario,
+                  "size": size}
+        result.update(measure_flow(make_flow()))
+        json.dump(result, sys.stdout)
+        sys.stdout.write("\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""Benchmark the round trips and wall time of durations inquiries.
+
+Runs against a local stub result server, which answers after a fixed
+latency, comparing the serial per-name inquiries to the batched ones, and
+timing the DurationsManager calculation of a synthetic suite's durations
+(with an empty and with a full cache).
+
+Usage:
+    python -m benchmarks.bench_durations [--names N] [--latency SECONDS]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from rotest_tklist.cache import DurationsCache
+from rotest_tklist.durations import DurationsManager
+from rotest_tklist.inquiry import ClientPool, StatisticsInquirer
+
+from benchmarks.suites import make_cases
+
+
+class StubResultServer(object):
+    """Local stand-in for the result server, counting the round trips.
+
+    Attributes:
+        latency (number): seconds each request takes.
+        round_trips (number): number of requests handled.
+    """
+    def __init__(self, latency):
+        self.latency = latency
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def handle(self, names):
+        """Answer a statistics request for the given names."""
+        with self._lock:
+            self.round_trips += 1
+
+        time.sleep(self.latency)
+        return {name: {'min': 1.0, 'avg': 2.0, 'max': 3.0} for name in names}
+
+
+class StubClient(object):
+    """Client of the stub server, without a bulk statistics endpoint."""
+    def __init__(self, server):
+        self.server = server
+
+    def connect(self):
+        """Connect to the stub server (a no-op)."""
+
+    def get_statistics(self, test_name):
+        """Request the statistics of a single name."""
+        return self.server.handle([test_name])[test_name]
+
+
+class StubBulkClient(StubClient):
+    """Client of the stub server, with a bulk statistics endpoint."""
+    def get_statistics_batch(self, test_names):
+        """Request the statistics of multiple names in one round trip."""
+        return self.server.handle(test_names)
+
+
+def run_serial(names, latency):
+    """Inquiry the names one by one, with a single client."""
+    server = StubResultServer(latency)
+    client = StubClient(server)
+    client.connect()
+    for name in names:
+        client.get_statistics(name)
+
+    return server
+
+
+def run_batched(names, latency, client_class, pool_size):
+    """Inquiry the names in batches, using a thread and client pools."""
+    server = StubResultServer(latency)
+    inquirer = StatisticsInquirer(
+                        ClientPool(pool_size, lambda: client_class(server)))
+    results = {}
+    with ThreadPoolExecutor(max_workers=pool_size) as executor:
+        wait([executor.submit(inquirer.inquire, batch,
+                              lambda name, *result: results.update(
+                                                        {name: result}))
+              for batch in inquirer.split(names)])
+
+    assert len(results) == len(set(names))
+    return server
+
+
+class StubWidget(object):
+    """Stand-in for the calculation's button, and for the Tk main loop."""
+    def __init__(self):
+        self.text = "Calculate durations"
+        self._scheduled = []
+
+    def cget(self, _):
+        """Return the button's text."""
+        return self.text
+
+    def config(self, text):
+        """Set the button's text."""
+        self.text = text
+
+    def after(self, milliseconds, callback):
+        """Schedule a callback."""
+        self._scheduled.append((time.time() + milliseconds / 1000.0,
+                                callback))
+
+    def winfo_exists(self):
+        """Return whether the widget exists."""
+        return True
+
+    def run(self):
+        """Call the scheduled callbacks, until none is left."""
+        while self._scheduled:
+            due, callback = self._scheduled.pop(0)
+            time.sleep(max(due - time.time(), 0))
+            callback()
+
+
+class StubEvent(object):
+    """Stand-in for the click event on the calculation's button."""
+    def __init__(self, widget):
+        self.widget = widget
+
+
+def run_manager(tests, server, cache_path):
+    """Calculate the tests' durations with the durations manager."""
+    DurationsManager.CLIENT_FACTORY = lambda: StubBulkClient(server)
+    DurationsManager._EXECUTOR = None
+    DurationsManager._CACHE = DurationsCache(path=cache_path)
+    button = StubWidget()
+    DurationsManager.calculate_times(StubEvent(button), tests)
+    button.run()
+    return server
+
+
+def main(argv=None):
+    """Run the scenarios and print a JSON result line for each."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--pool-size", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    # Repeat some names, like methods shared by flows in a recursive walk
+    names = ["Test{}.test_method".format(index % (args.names * 3 // 4))
+             for index in range(args.names)]
+    scenarios = [
+        ("serial", lambda: run_serial(names, args.latency)),
+        ("batched_per_name", lambda: run_batched(names, args.latency,
+                                                 StubClient, args.pool_size)),
+        ("batched_bulk", lambda: run_batched(names, args.latency,
+                                             StubBulkClient, args.pool_size)),
+    ]
+    tests = make_cases(args.names // 10, methods=10)
+    directory = tempfile.mkdtemp()
+    cache_path = os.path.join(directory, 'durations.sqlite')
+    for scenario in ("manager_empty_cache", "manager_full_cache"):
+        scenarios.append((scenario, lambda: run_manager(
+                tests, StubResultServer(args.latency), cache_path)))
+
+    try:
+        for scenario, run in scenarios:
+            start = time.time()
+            server = run()
+            json.dump({"benchmark": "durations",
+                       "scenario": scenario,
+                       "names": len(names),
+                       "latency": args.latency,
+                       "round_trips": server.round_trips,
+                       "wall_time": round(time.time() - start, 4)},
+                      sys.stdout)
+            sys.stdout.write("\n")
+
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark the import time of the package's rotest entry points.
+
+Rotest imports the package on every run, so importing it must not load the
+explorer's heavy dependencies. Exits with an error code if any of them was
+loaded.
+
+Usage:
+    python -m benchmarks.bench_import [--repeat N]
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+
+HEAVY_MODULES = ('tkinter',
+                 'rotest.core',
+                 'rotest.management.client.result_client',
+                 'rotest_tklist.gui',
+                 'rotest_tklist.durations',
+                 'rotest_tklist.analysis')
+
+IMPORT_SCRIPT = """
+import sys, json, time
+start = time.time()
+from rotest_tklist import tk_list_option, tk_list_action
+duration = time.time() - start
+json.dump({"duration": duration,
+           "loaded": [name for name in %r if name in sys.modules]},
+          sys.stdout)
+""" % (HEAVY_MODULES,)
+
+
+def measure_import():
+    """Import the entry points in a fresh interpreter.
+
+    Returns:
+        dict. the import duration and the heavy modules that were loaded.
+    """
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SCRIPT])
+    return json.loads(output.decode())
+
+
+def main(argv=None):
+    """Measure the import and print a JSON result line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = [measure_import() for _ in range(args.repeat)]
+    loaded = sorted(set(name for result in results
+                        for name in result["loaded"]))
+    json.dump({"benchmark": "import",
+               "repeat": args.repeat,
+               "min_time": round(min(result["duration"]
+                                     for result in results), 6),
+               "heavy_modules_loaded": loaded}, sys.stdout)
+    sys.stdout.write("\n")
+    return 1 if loaded else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Benchmark the memory held by the analyses of wide and deep flows.
+
+Measures, using tracemalloc, the memory allocated by analyzing a flow that
+is still held once the analysis is done, and the peak during it. Run it on
+two versions of the package to compare their component models.
+
+Usage:
+    python -m benchmarks.bench_memory [--width N] [--depth N]
+"""
+import gc
+import sys
+import json
+import argparse
+import tracemalloc
+
+from rotest_tklist.analysis import FlowComponentData
+
+from benchmarks.suites import make_wide_flow, make_deep_flow
+from benchmarks.bench_analysis import clear_caches
+
+
+def measure_flow(flow):
+    """Measure the memory held by the analysis of a flow.
+
+    Args:
+        flow (type): flow class to analyze.
+
+    Returns:
+        dict. the number of components, and the held and peak bytes.
+    """
+    clear_caches()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        flow_data = FlowComponentData.analyze(flow)
+        for component in flow_data.iterate():
+            component.get_description()
+
+        gc.collect()
+        held, peak = tracemalloc.get_traced_memory()
+
+    finally:
+        tracemalloc.stop()
+
+    components = sum(1 for _ in flow_data.iterate())
+    return {"components": components,
+            "held_bytes": held,
+            "peak_bytes": peak,
+            "bytes_per_component": held // max(components, 1)}
+
+
+def main(argv=None):
+    """Run the scenarios and print a JSON result line for each."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--width", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=9)
+    args = parser.parse_args(argv)
+
+    scenarios = [
+        ("wide", args.width, lambda: make_wide_flow(args.width)),
+        ("deep", args.depth, lambda: make_deep_flow(args.depth)),
+    ]
+    for scenario, size, make_flow in scenarios:
+        result = {"benchmark": "memory",
+                  "scenario": scenario,
+                  "size": size}
+        result.update(measure_flow(make_flow()))
+        json.dump(result, sys.stdout)
+        sys.stdout.write("\n")
+
+
+if __name__ == '__main__':
+    main()
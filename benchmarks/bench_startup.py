@@ -0,0 +1,80 @@
+"""Benchmark the explorer's startup and the opening of a flow's tab.
+
+The window is withdrawn, so it's never shown, but Tk still needs a display
+(e.g. a virtual one, using Xvfb). Without one, the result line is marked
+as skipped.
+
+Usage:
+    python -m benchmarks.bench_startup [--cases N] [--flows N]
+"""
+import sys
+import json
+import time
+import argparse
+import tkinter as tk
+from tkinter import ttk
+
+from rotest_tklist.gui import create_explorer, _explore_subtest
+from rotest_tklist.snapshot import AnalysisSnapshot
+
+from benchmarks.suites import make_suite, make_deep_flow
+
+
+def measure_startup(tests, flow):
+    """Measure creating the explorer, and the tab of a flow.
+
+    Args:
+        tests (list): test classes to list.
+        flow (type): flow class to open a tab of.
+
+    Returns:
+        dict. the durations of the stages.
+    """
+    start = time.time()
+    window = create_explorer(tests)
+    window.withdraw()
+    window.update_idletasks()
+    startup_time = time.time() - start
+
+    try:
+        tab_control = ttk.Notebook(window)
+        start = time.time()
+        _explore_subtest(tab_control, flow)
+        window.update_idletasks()
+        flow_tab_time = time.time() - start
+
+    finally:
+        window.destroy()
+
+    return {"startup_time": round(startup_time, 6),
+            "flow_tab_time": round(flow_tab_time, 6)}
+
+
+def main(argv=None):
+    """Run the benchmark and print a JSON result line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=6000)
+    parser.add_argument("--flows", type=int, default=100)
+    parser.add_argument("--width", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=6)
+    args = parser.parse_args(argv)
+    # The synthetic classes are the same on every run, so a persistent
+    # snapshot would hide the analysis of the suite
+    AnalysisSnapshot.ENABLED = False
+
+    result = {"benchmark": "startup",
+              "cases": args.cases,
+              "flows": args.flows}
+    tests = make_suite(args.cases, args.flows, args.width, args.depth)
+    try:
+        result.update(measure_startup(tests, make_deep_flow(args.depth + 2)))
+
+    except tk.TclError as error:
+        result["skipped"] = str(error)
+
+    json.dump(result, sys.stdout)
+    sys.stdout.write("\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Generators of large synthetic rotest suites for the benchmarks.
+
+The generated classes are created at runtime and aren't registered in any
+module, so they can be generated at any size without touching the disk.
+"""
+from rotest.core import (TestCase, TestFlow, TestBlock, Pipe, BlockInput,
+                         BlockOutput, MODE_OPTIONAL, MODE_FINALLY)
+from rotest.management.base_resource import BaseResource
+
+
+class BenchmarkResource(BaseResource):
+    """Resource requested by the synthetic tests."""
+    DATA_CLASS = None
+
+
+def _test_method(_):
+    """Empty test method of the synthetic tests."""
+
+
+def make_cases(count, methods=10, tags=20):
+    """Create test cases with many methods each.
+
+    Args:
+        count (number): number of test cases to create.
+        methods (number): number of test methods in each case.
+        tags (number): number of distinct tags to spread over the cases.
+
+    Returns:
+        list. the created TestCase classes.
+    """
+    cases = []
+    for index in range(count):
+        attributes = {'TAGS': ['tag{}'.format(index % tags),
+                               'group{}'.format(index % 7)],
+                      'device': BenchmarkResource.request(index=index),
+                      '__doc__': "Synthetic test case {}.".format(index)}
+        for method_index in range(methods):
+            attributes['test_method_{}'.format(method_index)] = _test_method
+
+        cases.append(type('Case{}'.format(index), (TestCase,), attributes))
+
+    return cases
+
+
+def make_block(index):
+    """Create a block with inputs and an output, to chain with Pipes.
+
+    Args:
+        index (number): index of the block, used in its name.
+
+    Returns:
+        type. the created TestBlock class.
+    """
+    return type('Block{}'.format(index), (TestBlock,),
+                {'device': BlockInput(),
+                 'source': BlockInput(),
+                 'level': BlockInput(default=1),
+                 'result': BlockOutput(),
+                 'test_method': _test_method})
+
+
+def _chain(components, prefix):
+    """Connect the components' results to the next ones' sources by Pipes.
+
+    Nested flows are self contained, so they aren't connected. Every third
+    component overrides the common's level, and every tenth one is optional
+    (or finally, for the last one).
+    """
+    blocks = []
+    links = 0
+    for index, component in enumerate(components):
+        parameters = {}
+        if not issubclass(component, TestFlow):
+            parameters['source'] = Pipe('{}_{}'.format(prefix, links))
+            parameters['result'] = Pipe('{}_{}'.format(prefix, links + 1))
+            links += 1
+
+        if index % 3 == 0:
+            parameters['level'] = index
+
+        if index % 10 == 9:
+            parameters['mode'] = MODE_OPTIONAL
+
+        if index == len(components) - 1 and index > 0:
+            parameters['mode'] = MODE_FINALLY
+
+        blocks.append(component.params(**parameters))
+
+    return tuple(blocks)
+
+
+def make_wide_flow(width, name='WideFlow'):
+    """Create a flow of many chained blocks.
+
+    Args:
+        width (number): number of blocks in the flow.
+        name (str): name of the created class.
+
+    Returns:
+        type. the created TestFlow class.
+    """
+    blocks = [make_block(index) for index in range(width)]
+    return type(name, (TestFlow,),
+                {'device': BenchmarkResource.request(),
+                 'common': {'level': 0, 'wide_0': 'start'},
+                 'blocks': _chain(blocks, 'wide')})
+
+
+def make_deep_flow(depth, width=3, name='DeepFlow'):
+    """Create nested flows, each level wrapping the previous one.
+
+    Each level is a chain of blocks around the previous level's flow, which
+    is used twice, so the number of components grows exponentially.
+
+    Args:
+        depth (number): number of nesting levels.
+        width (number): number of blocks in each level.
+        name (str): name of the outermost class.
+
+    Returns:
+        type. the created TestFlow class.
+    """
+    flow = make_wide_flow(width, name='Level0')
+    for level in range(1, depth):
+        components = [make_block(index) for index in range(width)]
+        components.insert(width // 2, flow)
+        components.append(flow)
+        prefix = 'level{}'.format(level)
+        flow = type('Level{}'.format(level), (TestFlow,),
+                    {'common': {'level': level, prefix + '_0': 'start'},
+                     'blocks': _chain(components, prefix)})
+
+    return type(name, (flow,), {'device': BenchmarkResource.request()})
+
+
+def make_suite(cases, flows, width, depth):
+    """Create a mixed suite of test cases, wide flows and deep flows.
+
+    Args:
+        cases (number): number of test cases.
+        flows (number): number of flows, half wide and half deep.
+        width (number): number of blocks in each flow (or flow level).
+        depth (number): nesting depth of the deep flows.
+
+    Returns:
+        list. the created test classes.
+    """
+    tests = make_cases(cases)
+    for index in range(flows):
+        if index % 2:
+            tests.append(make_deep_flow(depth, name='DeepFlow{}'.format(
+                                                                    index)))
+
+        else:
+            tests.append(make_wide_flow(width, name='WideFlow{}'.format(
+                                                                    index)))
+
+    return tests
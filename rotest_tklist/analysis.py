@@ -0,0 +1,491 @@
+"""Flows connectivity analysis."""
+import sys
+from collections import OrderedDict
+
+from rotest.core import (TestFlow, Pipe,
+                         MODE_CRITICAL, MODE_OPTIONAL, MODE_FINALLY)
+
+from rotest_tklist.profiling import TIMINGS
+from rotest_tklist.resources import get_requests
+
+
+MODE_TO_STRING = {MODE_CRITICAL: 'Critial',
+                  MODE_OPTIONAL: 'Optional',
+                  MODE_FINALLY: 'Finally'}
+PARENT_RESOURCE = '(parent resource)'
+
+
+def _describe_provider(provider):
+    """Return the display string of an input's provider or an usage."""
+    if isinstance(provider, FlowComponentData):
+        return provider.long_name
+
+    return provider
+
+
+class ReadOnlyDict(dict):
+    """Dict that is shared, so it can't be modified in place."""
+    __slots__ = ()
+
+    def _read_only(self, *_args, **_kwargs):
+        """Refuse modifying the dict."""
+        raise TypeError("%s is read-only" % type(self).__name__)
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+
+NO_USAGES = ReadOnlyDict()
+
+
+class FlowComponentData(object):
+    """Data wrapper class for flow components.
+
+    This class calculates the input/output connectivity of the component
+    recursively and finds errors. The component's class isn't modified.
+
+    Large flows have many components, so the instances are kept compact:
+    they are slotted, share the per-class data (see get_interface), refer
+    to the components connected to them instead of keeping their names, and
+    render their long names and descriptions on demand.
+
+    The shared dicts are read-only, and an instance replaces them by its own
+    copies only when it has to change them (see _writable). The outputs'
+    usages are allocated only for outputs that are used.
+
+    Attributes:
+        SPECIAL_PARAMETERS (tuple): parameters of the common that configure
+            the component itself, and aren't passed to it.
+        ANALYSES_CAPACITY (number): maximal number of analyses to keep.
+    """
+    SPECIAL_PARAMETERS = ('name', 'mode')
+    ANALYSES_CAPACITY = 100
+
+    __slots__ = ('cls', 'indent', 'parent', 'name', 'mode', 'common',
+                 'actual_inputs', 'actual_outputs', 'inputs', 'outputs',
+                 'errors', 'own_errors', 'unconnected_inputs', 'is_flow',
+                 'children', 'resources')
+
+    _ANALYSES = OrderedDict()  # flow class -> its analysis, LRU
+    _INTERFACES = {}
+    _UNCONNECTED = {}  # flow class -> its unconnected inputs
+
+    def __init__(self, cls, indent=0, parent=None):
+        self.cls = cls
+        self.indent = indent
+        self.parent = parent
+        self.name = sys.intern(cls.common.get('name', cls.__name__))
+        self.mode = cls.common.get('mode', cls.mode)
+
+        # inputs: original input name -> actual input name
+        # actual_inputs: input name -> provider description or component
+        # outputs: original output name -> actual output name
+        (self.resources, self.inputs, self.actual_inputs, self.outputs,
+         self.common, self.errors) = self.get_interface(cls)
+        # actual_outputs: output name -> list of using components, only for
+        # the used outputs
+        self.actual_outputs = NO_USAGES
+
+        self.own_errors = ()
+        self.unconnected_inputs = ()
+
+        self.is_flow = issubclass(cls, TestFlow)
+        self.children = ()
+        if self.is_flow:
+            self.children = tuple(FlowComponentData(block_class, indent + 1,
+                                                    self)
+                                  for block_class in cls.blocks)
+
+        self.find_connections()
+
+    @property
+    def long_name(self):
+        """Name of the component, prefixed by the names of its parent flows.
+
+        The top flow's name isn't included, except in its own long name.
+        """
+        if self.indent == 0:
+            return self.name
+
+        names = []
+        component = self
+        while component.indent > 0:
+            names.append(component.name)
+            component = component.parent
+
+        return ".".join(reversed(names))
+
+    @staticmethod
+    def _writable(mapping):
+        """Return the mapping, or a copy of it if it's a shared one."""
+        if isinstance(mapping, ReadOnlyDict):
+            return dict(mapping)
+
+        return mapping
+
+    def _rename_input(self, name, parameter_name):
+        """Connect an input to a parameter of another name, by a Pipe."""
+        parameter_name = sys.intern(parameter_name)
+        self.inputs = self._writable(self.inputs)
+        self.inputs[name] = parameter_name
+        self.actual_inputs = self._writable(self.actual_inputs)
+        self.actual_inputs.pop(name)
+        if parameter_name not in self.actual_inputs:
+            self.actual_inputs[parameter_name] = ''
+
+    def _rename_output(self, name, parameter_name):
+        """Connect an output to a parameter of another name, by a Pipe."""
+        parameter_name = sys.intern(parameter_name)
+        self.outputs = self._writable(self.outputs)
+        self.outputs[name] = parameter_name
+        if name in self.actual_outputs:
+            self.actual_outputs[parameter_name] = self.actual_outputs.pop(name)
+
+    def connect_input(self, name, provider):
+        """Set the provider of one of the component's actual inputs."""
+        self.actual_inputs = self._writable(self.actual_inputs)
+        self.actual_inputs[name] = provider
+
+    def add_usages(self, name, components):
+        """Register components using one of the component's outputs."""
+        self.actual_outputs = self._writable(self.actual_outputs)
+        self.actual_outputs.setdefault(name, []).extend(components)
+
+    @classmethod
+    def get_interface(cls, component_class):
+        """Return the per-class data of a component, with its Pipes applied.
+
+        Finding the declarations requires scanning the class's fields, so the
+        result is cached per class, and shared by the class's instances.
+        The common's Pipes rename the inputs and outputs here, and unknown
+        parameters in the common are found here too.
+
+        Args:
+            component_class (type): block or flow class.
+
+        Returns:
+            tuple. tuple of requested resources names, read-only dicts of
+                original input name -> actual input name, actual input name
+                -> its initial provider description (the default value of
+                optional inputs), original output name -> actual output name
+                (the common's names for flows), dict of the common's
+                parameters (without the special ones), and tuple of errors.
+        """
+        if component_class not in cls._INTERFACES:
+            resources = tuple(sys.intern(request.name) for request in
+                              get_requests(component_class))
+            common = component_class.common
+            if any(name in common for name in cls.SPECIAL_PARAMETERS):
+                common = {sys.intern(name): value
+                          for name, value in common.items()
+                          if name not in cls.SPECIAL_PARAMETERS}
+
+            is_flow = issubclass(component_class, TestFlow)
+            providers = {}
+            if is_flow:
+                outputs = {name: name for name in common}
+
+            else:
+                for name, instance in component_class.get_inputs().items():
+                    providers[sys.intern(name)] = ''
+                    if instance.is_optional():
+                        providers[name] = '(default value = %s)' % \
+                                                            instance.default
+
+                outputs = {name: name for name in
+                           map(sys.intern, component_class.get_outputs())}
+
+            inputs = {name: name for name in providers}
+            errors = cls.handle_common(common, inputs, providers, outputs,
+                                       is_flow)
+            cls._INTERFACES[component_class] = (
+                    resources, ReadOnlyDict(inputs), ReadOnlyDict(providers),
+                    ReadOnlyDict(outputs), common, errors)
+
+        return cls._INTERFACES[component_class]
+
+    @staticmethod
+    def handle_common(common, inputs, providers, outputs, is_flow):
+        """Scan a common, applying Pipes and finding unknown parameters.
+
+        Args:
+            common (dict): the common's parameters.
+            inputs (dict): original input name -> actual input name.
+            providers (dict): actual input name -> its provider description.
+            outputs (dict): original output name -> actual output name.
+            is_flow (bool): whether the common is a flow's.
+
+        Returns:
+            tuple. errors of unknown parameters.
+        """
+        errors = []
+        for name, value in common.items():
+            if isinstance(value, Pipe) and value.parameter_name != name:
+                parameter_name = sys.intern(value.parameter_name)
+
+            else:
+                parameter_name = None
+
+            if name in inputs:
+                if parameter_name:
+                    inputs[name] = parameter_name
+                    providers.pop(name)
+                    providers.setdefault(parameter_name, '')
+
+            elif name in outputs:
+                if parameter_name:
+                    outputs[name] = parameter_name
+
+            elif not is_flow:
+                errors.append("Unknown input %r" % name)
+
+        return tuple(errors)
+
+    @classmethod
+    def analyze(cls, flow_class):
+        """Return the connectivity analysis of a flow, with its errors.
+
+        The ANALYSES_CAPACITY most recently requested analyses are cached.
+
+        Args:
+            flow_class (type): flow class to analyze.
+
+        Returns:
+            FlowComponentData. the analyzed top component.
+        """
+        flow_data = cls._ANALYSES.pop(flow_class, None)
+        if flow_data is not None:
+            TIMINGS.count("analysis cache hits")
+
+        else:
+            TIMINGS.count("analysis cache misses")
+            flow_data = cls._analyze_new(flow_class)
+
+        cls._ANALYSES[flow_class] = flow_data
+        while len(cls._ANALYSES) > cls.ANALYSES_CAPACITY:
+            cls._ANALYSES.popitem(last=False)
+
+        return flow_data
+
+    @classmethod
+    def _analyze_new(cls, flow_class):
+        """Analyze a flow, and keep its unconnected inputs."""
+        with TIMINGS.span("analysis"):
+            flow_data = cls(flow_class)
+            flow_data.find_unconnected()
+
+        cls._UNCONNECTED[flow_class] = flow_data.unconnected_inputs
+        return flow_data
+
+    @classmethod
+    def get_unconnected_inputs(cls, flow_class):
+        """Return the inputs a flow leaves unconnected on its own.
+
+        Only the inputs' names are cached per class, the flow's analysis
+        isn't kept for them, so nested flows don't keep whole trees.
+
+        Args:
+            flow_class (type): flow class to analyze.
+
+        Returns:
+            tuple. the unconnected inputs' names, prefixed by the names of
+                their components.
+        """
+        if flow_class not in cls._UNCONNECTED:
+            cls._analyze_new(flow_class)
+
+        return cls._UNCONNECTED[flow_class]
+
+    @classmethod
+    def forget(cls, component_classes):
+        """Remove the cached analyses and interfaces of component classes.
+
+        Args:
+            component_classes (iterable): classes that were replaced, e.g.
+                by reloading their modules.
+        """
+        for component_class in component_classes:
+            cls._ANALYSES.pop(component_class, None)
+            cls._INTERFACES.pop(component_class, None)
+            cls._UNCONNECTED.pop(component_class, None)
+
+    def propagate_value(self, name, value, provider):
+        """Try to connect a value into the component's inputs.
+
+        Args:
+            name (str): name of the input to find.
+            value (object): value to propagate (if known in advance).
+            provider (str): which component provided the value.
+
+        Returns:
+            list. the components the value was connected to.
+        """
+        total_connections = []
+        if not self.is_flow:
+            if name in self.actual_inputs:
+                if isinstance(value, Pipe):
+                    if value.parameter_name != name:
+                        self._rename_input(name, value.parameter_name)
+
+                else:
+                    self.connect_input(name, provider)
+                    return [self]
+
+            elif name in self.outputs.values() and isinstance(value, Pipe):
+                if value.parameter_name != name:
+                    self._rename_output(name, value.parameter_name)
+
+        else:
+            for child in self.children:
+                total_connections.extend(child.propagate_value(
+                                                        name, value, provider))
+
+        return total_connections
+
+    def apply_common(self):
+        """Connect values in the common to inputs/sub-components."""
+        if not self.is_flow:
+            for name, value in self.common.items():
+                if name in self.actual_inputs and not isinstance(value, Pipe):
+                    self.connect_input(name, '(parameter = %s)' % value)
+
+        else:
+            for name, value in self.common.items():
+                total_usages = []
+                for child in self.children:
+                    total_usages.extend(child.propagate_value(name, value,
+                                                      '(parent = %s)' % value))
+
+                if total_usages:
+                    if name in self.outputs.values():
+                        self.add_usages(name, total_usages)
+
+                else:
+                    self.errors += ("Unknown input %r" % name,)
+
+    def apply_resources(self):
+        """Connect the requested resources to inputs/sub-components."""
+        for resource in self.resources:
+            self.propagate_value(resource, None, PARENT_RESOURCE)
+
+    def index_consumers(self):
+        """Map input names to the blocks under the component that use them.
+
+        The blocks' actual input names are used, so inputs renamed by Pipes
+        are indexed by the name of the parameter they are connected to.
+
+        Returns:
+            dict. input name -> list of blocks, in the flow's order.
+        """
+        consumers = {}
+        for component in self.iterate():
+            if not component.is_flow:
+                for name in component.actual_inputs:
+                    consumers.setdefault(name, []).append(component)
+
+        return consumers
+
+    def connect_children(self):
+        """Connect children's outputs to their siblings' inputs."""
+        consumers = {}  # input name -> list of (child index, block)
+        for index, child in enumerate(self.children):
+            for name, blocks in child.index_consumers().items():
+                consumers.setdefault(name, []).extend(
+                                            (index, block) for block in blocks)
+
+        for index, child in enumerate(self.children):
+            for output in dict.fromkeys(child.outputs.values()):
+                blocks = [block for sibling_index, block
+                          in consumers.get(output, ())
+                          if sibling_index > index]
+                for block in blocks:
+                    block.connect_input(output, child)
+
+                if blocks:
+                    child.add_usages(output, blocks)
+
+    def find_connections(self):
+        """Find all connections of inputs and outputs recursively."""
+        # parent common value
+        # child common value (overrides parent)
+        # parent resource
+        # output (overrides previous)
+        # child resource
+        self.apply_common()
+        for child in self.children:
+            child.apply_common()
+
+        self.apply_resources()
+        self.connect_children()
+        for child in self.children:
+            child.apply_resources()
+
+    def find_unconnected(self):
+        """Find unconnected inputs and register them as errors.
+
+        The errors are final after this, so they're kept as tuples.
+        """
+        errors = list(self.errors)
+        unconnected_inputs = []
+        for input_name, provider in self.actual_inputs.items():
+            if not provider:
+                errors.append("Input %r is not connected!" % input_name)
+                unconnected_inputs.append(
+                                    "{}.{}".format(self.long_name, input_name))
+
+        self.own_errors = tuple(errors)
+        errors = []
+        for child in self.children:
+            child.find_unconnected()
+            errors.extend(child.errors)
+            unconnected_inputs.extend(child.unconnected_inputs)
+
+        self.errors = self.own_errors + tuple(errors)
+        self.unconnected_inputs = tuple(unconnected_inputs)
+
+        if self.is_flow and self.indent > 0:
+            unconnected = self.get_unconnected_inputs(self.cls)
+            if unconnected:
+                self.inputs = self._writable(self.inputs)
+                self.actual_inputs = self._writable(self.actual_inputs)
+                for name in unconnected:
+                    self.inputs[name] = name
+                    self.actual_inputs[name] = ''
+
+    def get_description(self):
+        """Return a description string for the component's connectivity.
+
+        The description isn't kept, it's rendered again on each call.
+        """
+        lines = ["Required Inputs:\n" if self.is_flow else "Inputs:\n"]
+        for name, actual_input in self.inputs.items():
+            lines.append("    {} <- ".format(name))
+            if name != actual_input:
+                lines.append("{} <- ".format(actual_input))
+
+            lines.append("{}\n".format(_describe_provider(
+                                            self.actual_inputs[actual_input])))
+
+        lines.append("\nCommon:\n" if self.is_flow else "\nOutputs:\n")
+        for output, actual_output in self.outputs.items():
+            lines.append("    {} -> ".format(output))
+            if output != actual_output:
+                lines.append("{} -> ".format(actual_output))
+
+            lines.append("{}\n".format(', '.join(
+                                _describe_provider(usage) for usage in
+                                self.actual_outputs.get(actual_output, ()))))
+
+        if self.errors:
+            lines.append("\nErrors:\n")
+            lines.extend("    {}\n".format(error) for error in self.errors)
+
+        return "".join(lines)
+
+    def iterate(self):
+        """Yield the component data wrapper and it sub components."""
+        yield self
+
+        for child in self.children:
+            for sub_component in child.iterate():
+                yield sub_component
@@ -0,0 +1,178 @@
+"""Persistent cache of tests durations statistics."""
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict, namedtuple
+
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_ERROR_TTL = 60 * 60
+DEFAULT_MAX_ENTRIES = 100000
+
+CacheEntry = namedtuple('CacheEntry', ['statistics', 'error', 'stale'])
+
+
+def get_cache_dir():
+    """Return the directory to keep the package's caches in.
+
+    Returns:
+        str. path of the user's cache directory for rotest_tklist.
+    """
+    if sys.platform.startswith('win'):
+        base = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+
+    else:
+        base = os.environ.get('XDG_CACHE_HOME',
+                              os.path.join(os.path.expanduser('~'), '.cache'))
+
+    return os.path.join(base, 'rotest_tklist')
+
+
+def open_database(path, schema, query):
+    """Open an sqlite database, creating its table and loading its rows.
+
+    Args:
+        path (str): path of the database file, or ':memory:'.
+        schema (str): statement creating the table, if it doesn't exist.
+        query (str): statement selecting the rows to load.
+
+    Returns:
+        tuple. the sqlite3.Connection and the list of loaded rows, or None
+            and an empty list if the database couldn't be opened.
+    """
+    try:
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute(schema)
+        return connection, connection.execute(query).fetchall()
+
+    except (OSError, sqlite3.Error):
+        return None, []
+
+
+class DurationsCache(object):
+    """Durations statistics cache, persisted in an sqlite database.
+
+    The raw statistics (or the error the server answered with) are kept per
+    test name, along with the time they were fetched. The entries are loaded
+    to memory when the cache is opened, and written through on updates.
+
+    Attributes:
+        path (str): path of the database file.
+        ttl (number): seconds after which statistics become stale.
+        error_ttl (number): seconds after which errors become stale.
+        max_entries (number): maximal number of entries to keep, the
+            entries that were fetched first are evicted.
+    """
+    def __init__(self, path=None, ttl=DEFAULT_TTL,
+                 error_ttl=DEFAULT_ERROR_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        if path is None:
+            path = os.path.join(get_cache_dir(), 'durations.sqlite')
+
+        self.path = path
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # In the order they were fetched
+        self._connection = self._connect()
+
+    def _connect(self):
+        """Open the database and load its entries, or work in memory only.
+
+        Returns:
+            sqlite3.Connection. connection to the database, or None if it
+                couldn't be opened.
+        """
+        connection, rows = open_database(
+                            self.path,
+                            "CREATE TABLE IF NOT EXISTS durations ("
+                            "name TEXT PRIMARY KEY, statistics TEXT, "
+                            "error TEXT, fetched REAL)",
+                            "SELECT name, statistics, error, fetched "
+                            "FROM durations ORDER BY fetched, rowid")
+        for name, statistics, error, fetched in rows:
+            if statistics is not None:
+                statistics = json.loads(statistics)
+
+            self._entries[name] = (statistics, error, fetched)
+
+        return connection
+
+    def get(self, name):
+        """Return the cached statistics of a test.
+
+        Args:
+            name (str): name of the test or component.
+
+        Returns:
+            CacheEntry. the cached statistics or error, or None if the name
+                isn't cached.
+        """
+        if name not in self._entries:
+            return None
+
+        statistics, error, fetched = self._entries[name]
+        ttl = self.ttl if error is None else self.error_ttl
+        return CacheEntry(statistics, error, time.time() - fetched > ttl)
+
+    def update(self, results):
+        """Cache the statistics or errors the server answered with.
+
+        Args:
+            results (dict): name -> (statistics dict, error string), where
+                only one of the two values is not None.
+        """
+        if not results:
+            return
+
+        now = time.time()
+        rows = []
+        for name, (statistics, error) in results.items():
+            self._entries.pop(name, None)
+            self._entries[name] = (statistics, error, now)
+            if statistics is not None:
+                statistics = json.dumps(statistics)
+
+            rows.append((name, statistics, error, now))
+
+        excess = max(len(self._entries) - self.max_entries, 0)
+        for _ in range(excess):
+            self._entries.popitem(last=False)
+
+        if self._connection is None:
+            return
+
+        with self._lock:
+            try:
+                with self._connection:
+                    self._connection.executemany(
+                                "INSERT OR REPLACE INTO durations "
+                                "VALUES (?, ?, ?, ?)", rows)
+                    if excess:
+                        self._connection.execute(
+                                "DELETE FROM durations WHERE rowid IN ("
+                                "SELECT rowid FROM durations "
+                                "ORDER BY fetched, rowid LIMIT ?)", (excess,))
+
+            except sqlite3.Error:
+                pass
+
+    def clear(self):
+        """Remove all the cached entries."""
+        self._entries.clear()
+        if self._connection is not None:
+            with self._lock:
+                try:
+                    with self._connection:
+                        self._connection.execute("DELETE FROM durations")
+
+                except sqlite3.Error:
+                    pass
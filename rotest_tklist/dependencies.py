@@ -0,0 +1,244 @@
+"""Data dependencies between the blocks of flows, and their parallelism."""
+import sys
+import json
+
+from rotest.core import TestFlow, MODE_FINALLY
+
+from rotest_tklist.cache import DurationsCache
+from rotest_tklist.estimates import DurationEstimator
+from rotest_tklist.analysis import (FlowComponentData, MODE_TO_STRING,
+                                    PARENT_RESOURCE)
+
+
+class FlowDependencies(object):
+    """Dependency DAG of the direct components of an analyzed flow.
+
+    A component depends on an earlier one if any of its blocks gets an
+    input from it (including through Pipes), if both use a resource of the
+    flow (resources are used by one component at a time), or if it's a
+    finally component, which runs after all the earlier ones. Data shared
+    in other ways (e.g. by the blocks' code) can't be seen, so the groups
+    are an upper bound of the possible parallelism.
+
+    Attributes:
+        flow_data (FlowComponentData): the analyzed flow.
+        components (tuple): the flow's direct components, in order.
+        dependencies (list): for each component, dict of the index of a
+            component it depends on -> list of the reasons.
+        durations (list): estimated seconds of each component, or None if
+            it has no history.
+    """
+    def __init__(self, flow_data, estimator=None):
+        self.flow_data = flow_data
+        self.components = flow_data.children
+        self._indexes = {component: index
+                         for index, component in enumerate(self.components)}
+        self.dependencies = [{} for _ in self.components]
+        self.durations = [None] * len(self.components)
+        if estimator is not None:
+            for index, component in enumerate(self.components):
+                estimate = estimator.estimate(component.cls)
+                if estimate.known:
+                    self.durations[index] = estimate.avg
+
+        self._find_dependencies()
+
+    def _get_index(self, component):
+        """Return the index of the direct component containing a component.
+
+        Returns:
+            number. the index, or None if it's not under the flow.
+        """
+        while component is not None and component.parent is not \
+                self.flow_data:
+            component = component.parent
+
+        return self._indexes.get(component)
+
+    def _add(self, index, dependency, reason):
+        """Register a dependency of a component on an earlier one."""
+        self.dependencies[index].setdefault(dependency, []).append(reason)
+
+    def _find_dependencies(self):
+        """Find the dependencies of each component on earlier ones."""
+        last_users = {}  # resource name -> index of its last user
+        for index, component in enumerate(self.components):
+            resources = set()
+            for block in component.iterate():
+                for name, provider in block.actual_inputs.items():
+                    if isinstance(provider, FlowComponentData):
+                        dependency = self._get_index(provider)
+                        if dependency is not None and dependency < index:
+                            self._add(index, dependency,
+                                      "input {!r} of {}".format(
+                                                    name, block.long_name))
+
+                    elif provider == PARENT_RESOURCE and \
+                            name in self.flow_data.resources:
+                        resources.add(name)
+
+            for name in sorted(resources):
+                if name in last_users:
+                    self._add(index, last_users[name],
+                              "resource {!r}".format(name))
+
+                last_users[name] = index
+
+            if component.mode == MODE_FINALLY:
+                for dependency in range(index):
+                    self._add(index, dependency, "finally")
+
+    def get_groups(self):
+        """Return the groups of components that could run concurrently.
+
+        Each component is in the group after the latest group of the
+        components it depends on.
+
+        Returns:
+            list. lists of component indexes, one for each group, in order.
+        """
+        levels = []
+        for dependencies in self.dependencies:
+            levels.append(1 + max([levels[dependency]
+                                   for dependency in dependencies],
+                                  default=-1))
+
+        groups = [[] for _ in range(max(levels, default=-1) + 1)]
+        for index, level in enumerate(levels):
+            groups[level].append(index)
+
+        return groups
+
+    def get_critical_path(self):
+        """Return the longest chain of dependent components, by duration.
+
+        Components without history are counted as taking no time.
+
+        Returns:
+            tuple. list of the path's component indexes, and its duration.
+        """
+        finishes = []
+        previous = []
+        for index, dependencies in enumerate(self.dependencies):
+            start = 0.0
+            latest = None
+            for dependency in dependencies:
+                if latest is None or finishes[dependency] > start:
+                    start = finishes[dependency]
+                    latest = dependency
+
+            finishes.append(start + (self.durations[index] or 0.0))
+            previous.append(latest)
+
+        if not finishes:
+            return [], 0.0
+
+        index = max(range(len(finishes)), key=finishes.__getitem__)
+        path = []
+        while index is not None:
+            path.append(index)
+            index = previous[index]
+
+        path.reverse()
+        return path, finishes[path[-1]]
+
+    def get_label(self, index):
+        """Return the display name of a component, by its index."""
+        return "#{} {}".format(index, self.components[index].name)
+
+    def to_dict(self):
+        """Return the dependencies report as JSON serializable data."""
+        path, parallel_time = self.get_critical_path()
+        sequential_time = sum(duration or 0.0
+                              for duration in self.durations)
+        return {"flow": self.flow_data.name,
+                "components": [
+                    {"name": self.get_label(index),
+                     "mode": MODE_TO_STRING[component.mode],
+                     "duration": self.durations[index],
+                     "depends_on": [{"component": self.get_label(dependency),
+                                     "reasons": reasons}
+                                    for dependency, reasons in sorted(
+                                        self.dependencies[index].items())]}
+                    for index, component in enumerate(self.components)],
+                "groups": [[self.get_label(index) for index in group]
+                           for group in self.get_groups()],
+                "critical_path": [self.get_label(index) for index in path],
+                "sequential_time": sequential_time,
+                "parallel_time": parallel_time,
+                "saving": sequential_time - parallel_time,
+                "unknown_durations": self.durations.count(None)}
+
+    def format(self):
+        """Return the dependencies report as text."""
+        report = self.to_dict()
+        lines = ["{}: {} components in {} groups".format(
+                    report["flow"], len(report["components"]),
+                    len(report["groups"]))]
+        for component in report["components"]:
+            for dependency in component["depends_on"]:
+                lines.append("    {} <- {}: {}".format(
+                                component["name"], dependency["component"],
+                                ", ".join(dependency["reasons"])))
+
+        for number, group in enumerate(report["groups"]):
+            lines.append("  Group {}: {}".format(number, ", ".join(group)))
+
+        lines.append("  Critical path: {}".format(
+                                        " -> ".join(report["critical_path"])))
+        lines.append("  Sequential {:.1f} min, parallel {:.1f} min, "
+                     "saving {:.1f} min".format(
+                                        report["sequential_time"] / 60.0,
+                                        report["parallel_time"] / 60.0,
+                                        report["saving"] / 60.0))
+        if report["unknown_durations"]:
+            lines.append("  {} components have no history, counted as "
+                         "taking no time".format(report["unknown_durations"]))
+
+        return "\n".join(lines)
+
+
+def report_dependencies(tests, output_format='text', stream=sys.stdout):
+    """Write the dependencies report of all the flows among the tests.
+
+    The durations are taken from the durations cache, without inquiring
+    the result server. Flows that fail to be analyzed are reported with
+    their error, and the other flows are still reported.
+
+    Args:
+        tests (list): test classes, only the flows among them are reported.
+        output_format (str): 'text' or 'json'.
+        stream (file): stream to write the report to.
+
+    Returns:
+        number. exit code, 1 if any flow failed to be analyzed and 0
+            otherwise.
+    """
+    estimator = DurationEstimator(DurationsCache())
+    reports = []  # (flow, its FlowDependencies or None, error or None)
+    for test in tests:
+        if not issubclass(test, TestFlow):
+            continue
+
+        try:
+            reports.append((test, FlowDependencies(
+                            FlowComponentData.analyze(test), estimator), None))
+
+        except Exception as error:  # pylint: disable=broad-except
+            reports.append((test, None,
+                            "Analysis failed: {}".format(error)))
+
+    if output_format == 'json':
+        stream.write(json.dumps(
+            {"flows": [report.to_dict() if report is not None else
+                       {"flow": flow.__name__, "error": error}
+                       for flow, report, error in reports]},
+            indent=4) + "\n")
+
+    else:
+        stream.write("\n\n".join(
+            report.format() if report is not None else
+            "{}: {}".format(flow.__name__, error)
+            for flow, report, error in reports) + "\n")
+
+    return 1 if any(error for _, _, error in reports) else 0
@@ -0,0 +1,574 @@
+"""Tests durations retrieval."""
+import time
+import heapq
+import queue
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from tkinter.messagebox import showerror
+from rotest.core import TestCase, TestFlow
+from rotest.management.client.result_client import ClientResultManager
+
+from rotest_tklist.cache import DurationsCache, CacheEntry, DEFAULT_TTL
+from rotest_tklist.profiling import TIMINGS
+from rotest_tklist.estimates import DurationEstimator
+from rotest_tklist.inquiry import (ClientPool, StatisticsInquirer,
+                                   ServerConnectionError, RequestError)
+
+
+def _format_durations(entry):
+    """Return a display string for the durations statistics of a component.
+
+    Args:
+        entry (CacheEntry): the statistics (name -> duration in seconds) or
+            the error received when requesting them.
+
+    Returns:
+        str. formatted durations.
+    """
+    if entry.error is not None:
+        return entry.error
+
+    formatted_durations = ''
+    for key, value in entry.statistics.items():
+        formatted_durations += "\n        {} : {:.1f} sec".format(key, value)
+
+    return formatted_durations
+
+
+class DurationsManager(object):
+    """Aux class to retrieve and cache test run durations.
+
+    Durations are fetched concurrently by a thread pool, each thread sending
+    a batch of names using a client from a bounded pool of connected clients
+    (see StatisticsInquirer). The results are handed
+    back to the Tk main loop as they arrive, and are kept in a persistent
+    cache. Cached durations are shown right away, and stale ones are fetched
+    again in the background.
+
+    Attributes:
+        CACHE_TTL (number): seconds after which cached durations are stale.
+        POOL_SIZE (number): maximal number of concurrent server requests.
+        REQUEST_TIMEOUT (number): seconds to wait for a single request, or
+            for any progress while names are waiting for a client (e.g.
+            behind requests that never return).
+        CLIENT_FACTORY (callable): creates the clients to inquiry with,
+            can be replaced to work against a stand-in result server.
+    """
+    CACHE_TTL = DEFAULT_TTL
+    POOL_SIZE = 8
+    REQUEST_TIMEOUT = 30
+    CLIENT_FACTORY = ClientResultManager
+
+    _CACHE = None
+    _ESTIMATOR = None
+    _PREFETCHER = None
+    _INQUIRER = None
+    _EXECUTOR = None
+    _FETCHES = {}
+    _LISTENERS = []
+    _CACHE_CHECKED = set()
+
+    @classmethod
+    def get_cache(cls):
+        """Return the durations cache, opening it on first use."""
+        if cls._CACHE is None:
+            cls._CACHE = DurationsCache(ttl=cls.CACHE_TTL)
+
+        return cls._CACHE
+
+    @classmethod
+    def get_estimator(cls):
+        """Return the estimator of the tests' durations from the cache."""
+        if cls._ESTIMATOR is None:
+            cls._ESTIMATOR = DurationEstimator(cls.get_cache())
+
+        return cls._ESTIMATOR
+
+    @classmethod
+    def calculate_times(cls, event, tests, recursive=False):
+        """Calculate durations for the given tests in the background.
+
+        Clicking the button again while the calculation is running cancels
+        it. The button's text shows the progress in the meantime.
+        """
+        button = event.widget
+        fetch = cls._FETCHES.pop(button, None)
+        if fetch is not None:
+            fetch.cancel()
+            return
+
+        components = []
+        for test in tests:
+            cls._collect_components(test, recursive, components)
+
+        fetch = DurationsFetch(cls, button, components, button=button)
+        cls._FETCHES[button] = fetch
+        fetch.start()
+
+    @classmethod
+    def load_cached(cls, test, widget):
+        """Set the test's duration from the cache, if it was cached.
+
+        Stale durations are shown, and fetched again in the background.
+        The refresh fails silently if the server can't be connected.
+
+        Args:
+            test (type): test class to load the duration of.
+            widget (tkinter.Widget): widget to schedule the refresh with.
+        """
+        if test in cls._CACHE_CHECKED or hasattr(test, '_tklist_duration'):
+            return
+
+        cls._CACHE_CHECKED.add(test)
+        components = []
+        cls._collect_components(test, False, components)
+        _, names, _ = components[0]
+        entries = [cls.get_cache().get(name) for name in names]
+        if any(entries):
+            DurationsFetch(cls, widget, components, stale_only=True,
+                           on_connection_error=lambda _: None).start()
+
+    @classmethod
+    def start_prefetching(cls, widget):
+        """Start fetching the durations of the shown tests in the background.
+
+        Args:
+            widget (tkinter.Widget): widget to schedule the fetches with.
+        """
+        if DurationsPrefetcher.ENABLED:
+            cls._PREFETCHER = DurationsPrefetcher(cls, widget)
+
+    @classmethod
+    def prefetch_visible(cls, tests):
+        """Prefetch the durations of the tests in the visible rows first."""
+        if cls._PREFETCHER is not None:
+            cls._PREFETCHER.set_visible(tests)
+
+    @classmethod
+    def prefetch_hovered(cls, test):
+        """Prefetch the duration of the hovered test before anything else."""
+        if cls._PREFETCHER is not None:
+            cls._PREFETCHER.set_hovered(test)
+
+    @classmethod
+    def _collect_components(cls, test, recursive, components):
+        """Collect the components to inquiry and their names."""
+        if issubclass(test, TestCase):
+            names = [test.get_name(method_name)
+                     for method_name in test.load_test_method_names()]
+            components.append((test, names, True))
+
+        else:
+            components.append((test, [test.get_name()], False))
+            if issubclass(test, TestFlow) and recursive:
+                for sub_test in test.blocks:
+                    cls._collect_components(sub_test, recursive, components)
+
+    @classmethod
+    def _get_executor(cls):
+        """Return the thread pool and the inquirer to fetch with.
+
+        Both are created on first use.
+
+        Returns:
+            tuple. the ThreadPoolExecutor and the StatisticsInquirer.
+        """
+        if cls._EXECUTOR is None:
+            pool = ClientPool(cls.POOL_SIZE, cls.CLIENT_FACTORY)
+            cls._INQUIRER = StatisticsInquirer(pool)
+            cls._EXECUTOR = ThreadPoolExecutor(max_workers=cls.POOL_SIZE)
+
+        return cls._EXECUTOR, cls._INQUIRER
+
+    @classmethod
+    def add_listener(cls, widget, callback):
+        """Register a callback to be called when a test's duration changes.
+
+        Args:
+            widget (tkinter.Widget): the listener is dropped once this widget
+                is destroyed.
+            callback (callable): called with the updated test class.
+        """
+        cls._LISTENERS.append((widget, callback))
+
+    @classmethod
+    def _update_cache(cls, results):
+        """Cache arrived statistics, and forget the estimates they change."""
+        cls.get_cache().update(results)
+        if cls._ESTIMATOR is not None:
+            cls._ESTIMATOR.invalidate(results)
+
+    @classmethod
+    def _notify(cls, test):
+        """Call the duration listeners of the live widgets."""
+        cls._LISTENERS[:] = [(widget, callback)
+                             for widget, callback in cls._LISTENERS
+                             if widget.winfo_exists()]
+        for _, callback in cls._LISTENERS:
+            callback(test)
+
+    @classmethod
+    def _finished(cls, fetch):
+        """Forget a fetch that completed or was cancelled."""
+        if cls._FETCHES.get(fetch.button) is fetch:
+            cls._FETCHES.pop(fetch.button)
+
+
+class DurationsFetch(object):
+    """A single cancellable durations calculation.
+
+    Attributes:
+        POLL_INTERVAL (number): milliseconds between results collections.
+        manager (type): the durations manager class.
+        widget (tkinter.Widget): widget to schedule the polling with.
+        button (tkinter.Button): button that started the calculation, to
+            show the progress on.
+        stale_only (bool): whether to inquiry only names that are cached,
+            but stale.
+        on_finish (callable): called with the calculation when it's done or
+            cancelled, or None.
+        on_connection_error (callable): called with the error if the server
+            couldn't be connected, instead of showing it, or None.
+        components (dict): test class -> names to inquiry and whether to
+            list the durations per name.
+        cancelled (bool): whether the calculation was cancelled.
+    """
+    POLL_INTERVAL = 100
+
+    def __init__(self, manager, widget, components, button=None,
+                 stale_only=False, on_finish=None, on_connection_error=None):
+        self.manager = manager
+        self.widget = widget
+        self.button = button
+        self.stale_only = stale_only
+        self.on_finish = on_finish
+        self.on_connection_error = on_connection_error
+        self.components = {}
+        self.cancelled = False
+
+        self._text = button.cget('text') if button is not None else None
+        self._results = queue.Queue()
+        self._futures = []
+        self._started = {}
+        self._progressed = None
+        self._pending = set()
+        self._resolved = {}
+        self._name_to_tests = {}
+        for test, names, per_name in components:
+            self.components.setdefault(test, (names, per_name))
+            for name in names:
+                self._name_to_tests.setdefault(name, []).append(test)
+
+    def start(self):
+        """Submit the inquiries and start polling for their results."""
+        cache = self.manager.get_cache()
+        for name in self._name_to_tests:
+            entry = cache.get(name)
+            if entry is not None:
+                self._resolved[name] = _format_durations(entry)
+
+            if entry is None and self.stale_only:
+                continue
+
+            if entry is None or entry.stale:
+                TIMINGS.count("durations cache misses")
+                self._pending.add(name)
+
+            else:
+                TIMINGS.count("durations cache hits")
+
+        self._progressed = time.time()
+        if self._pending:
+            executor, inquirer = self.manager._get_executor()
+            for batch in inquirer.split(self._pending):
+                self._futures.append(executor.submit(self._fetch, inquirer,
+                                                     batch))
+
+        for test in self._tests_of(self._resolved):
+            self._update_test(test)
+
+        self._poll()
+
+    def cancel(self):
+        """Stop the calculation, results that already arrived are kept."""
+        if self.cancelled:
+            return
+
+        self.cancelled = True
+        for future in self._futures:
+            future.cancel()
+
+        self._finish()
+
+    def _fetch(self, inquirer, batch):
+        """Inquiry the durations of a batch of names (worker thread)."""
+        if self.cancelled:
+            return
+
+        try:
+            inquirer.inquire(batch,
+                             on_result=lambda *result: self._results.put(
+                                                                    result),
+                             on_start=self._mark_started,
+                             should_stop=lambda: self.cancelled or
+                             not self._pending)
+
+        except ServerConnectionError as error:
+            self._results.put((batch[0], None, error))
+
+    def _mark_started(self, names):
+        """Register the time the inquiry of the names started."""
+        now = time.time()
+        for name in names:
+            self._started[name] = now
+
+    def _poll(self):
+        """Handle the arrived results and reschedule if not done."""
+        if self.cancelled:
+            return
+
+        if not self.widget.winfo_exists():
+            self.cancel()  # The tab was closed
+            return
+
+        arrived = {}
+        answers = {}
+        while True:
+            try:
+                name, durations, error = self._results.get_nowait()
+
+            except queue.Empty:
+                break
+
+            if name not in self._pending:
+                continue  # Arrived after its timeout
+
+            if isinstance(error, ServerConnectionError):
+                # The handler is called before finishing, so it can stop
+                # new fetches from being started on finish
+                if self.on_connection_error is not None:
+                    self.on_connection_error(error)
+                    self.cancel()
+
+                else:
+                    self.cancel()
+                    showerror(None,
+                              "Couldn't connect to server: {}".format(error))
+
+                return
+
+            self._pending.discard(name)
+            text = None if error is None else str(error)
+            if not isinstance(error, RequestError):
+                # Transient errors are shown, but aren't cached
+                answers[name] = (durations, text)
+
+            arrived[name] = _format_durations(
+                                        CacheEntry(durations, text, False))
+
+        now = time.time()
+        if arrived:
+            self._progressed = now
+
+        stalled = now - self._progressed > self.manager.REQUEST_TIMEOUT
+        for name in list(self._pending):
+            started = self._started.get(name)
+            if stalled or (started is not None and
+                           now - started > self.manager.REQUEST_TIMEOUT):
+                self._pending.discard(name)
+                if name not in self._resolved:
+                    arrived[name] = "Timed out after {} sec".format(
+                                                self.manager.REQUEST_TIMEOUT)
+
+        self.manager._update_cache(answers)
+        self._resolved.update(arrived)
+        for test in self._tests_of(arrived):
+            self._update_test(test)
+
+        if not self._pending:
+            self._finish()
+            return
+
+        if self.button is not None:
+            self.button.config(text="Cancel ({}/{})".format(
+                                    len(self._name_to_tests) -
+                                    len(self._pending),
+                                    len(self._name_to_tests)))
+
+        self.widget.after(self.POLL_INTERVAL, self._poll)
+
+    def _tests_of(self, names):
+        """Return the tests that inquired the given names, without repeats."""
+        tests = []
+        for name in names:
+            for test in self._name_to_tests[name]:
+                if test not in tests:
+                    tests.append(test)
+
+        return tests
+
+    def _update_test(self, test):
+        """Set the test's duration text with the results that arrived."""
+        names, per_name = self.components[test]
+        if per_name:
+            test._tklist_duration = "".join(
+                            "\n    {}: {}".format(name, self._resolved[name])
+                            for name in names if name in self._resolved)
+
+        else:
+            test._tklist_duration = self._resolved[names[0]]
+
+        self.manager._notify(test)
+
+    def _finish(self):
+        """Restore the button and unregister the calculation."""
+        if self.button is not None and self.button.winfo_exists():
+            self.button.config(text=self._text)
+
+        self.manager._finished(self)
+        if self.on_finish is not None:
+            self.on_finish(self)
+
+
+class DurationsPrefetcher(object):
+    """Fetch the durations of the tests the user is looking at, in advance.
+
+    Tests are queued by priority: the hovered test first, then the tests in
+    the visible rows, in their order. Entries of the same priority are
+    ordered by a counter, so the test classes are never compared. Setting
+    new visible rows or a new hovered test replaces the previous ones, so
+    work for rows that were scrolled away is dropped, and fetches of only
+    such tests are cancelled.
+    The queued tests are fetched in small batches, with a bounded number of
+    concurrent fetches, and their durations are cached like any other.
+
+    Prefetching stops if the server can't be connected, without showing
+    the error.
+
+    Attributes:
+        ENABLED (bool): whether the explorer should prefetch durations.
+        MAX_QUEUED (number): maximal number of visible tests to queue.
+        MAX_FETCHES (number): maximal number of concurrent fetches.
+        BATCH_SIZE (number): number of tests in each fetch.
+        manager (type): the durations manager class.
+        widget (tkinter.Widget): widget to schedule the fetches with.
+        enabled (bool): whether the prefetching is still active.
+    """
+    ENABLED = True
+    MAX_QUEUED = 200
+    MAX_FETCHES = 2
+    BATCH_SIZE = 10
+
+    HOVERED = 0
+    VISIBLE = 1
+
+    def __init__(self, manager, widget):
+        self.manager = manager
+        self.widget = widget
+        self.enabled = True
+        self._heap = []  # (priority, push order, test)
+        self._order = itertools.count()
+        self._hovered = None
+        self._visible = set()
+        self._fetches = {}  # fetch -> its tests
+        self._fetched = set()
+
+    def set_visible(self, tests):
+        """Replace the visible tests, and reprioritize.
+
+        Args:
+            tests (list): the tests in the visible rows, in their order.
+        """
+        tests = [test for test in tests if self._is_needed(test)]
+        self._visible = set(tests[:self.MAX_QUEUED])
+        self._heap = [(self.VISIBLE, next(self._order), test)
+                      for test in tests[:self.MAX_QUEUED]]
+        if self._hovered is not None:
+            self._heap.append((self.HOVERED, next(self._order),
+                               self._hovered))
+
+        heapq.heapify(self._heap)
+        self._cancel_stale()
+        self._dispatch()
+
+    def set_hovered(self, test):
+        """Prefetch the hovered test before the visible ones.
+
+        Args:
+            test (type): the hovered test class, or None.
+        """
+        self._hovered = test if test is not None and \
+            self._is_needed(test) else None
+        if len(self._heap) >= self.MAX_QUEUED:
+            # Drops the entries of the previously hovered tests
+            self._heap = [entry for entry in self._heap
+                          if self._is_wanted(entry[2])]
+            heapq.heapify(self._heap)
+
+        if self._hovered is not None:
+            heapq.heappush(self._heap, (self.HOVERED, next(self._order),
+                                        self._hovered))
+
+        self._dispatch()
+
+    def _is_needed(self, test):
+        """Return whether a test's durations weren't fetched yet."""
+        return test not in self._fetched and \
+            not hasattr(test, '_tklist_duration')
+
+    def _is_wanted(self, test):
+        """Return whether a test is still hovered or visible."""
+        return test is self._hovered or test in self._visible
+
+    def _cancel_stale(self):
+        """Cancel the fetches whose tests aren't wanted anymore."""
+        for fetch, tests in list(self._fetches.items()):
+            if not any(self._is_wanted(test) for test in tests):
+                fetch.cancel()
+
+    def _dispatch(self):
+        """Start fetches of the queued tests, up to the concurrency bound."""
+        while self.enabled and self._heap and \
+                len(self._fetches) < self.MAX_FETCHES and \
+                self.widget.winfo_exists():
+            tests = []
+            while self._heap and len(tests) < self.BATCH_SIZE:
+                _, _, test = heapq.heappop(self._heap)
+                if self._is_wanted(test) and self._is_needed(test) and \
+                        test not in tests and not self._is_fetching(test):
+                    tests.append(test)
+
+            if not tests:
+                return
+
+            components = []
+            for test in tests:
+                self.manager._collect_components(test, False, components)
+
+            fetch = DurationsFetch(
+                        self.manager, self.widget, components,
+                        on_finish=self._on_finish,
+                        on_connection_error=self._on_connection_error)
+            self._fetches[fetch] = tests
+            TIMINGS.count("prefetched tests", len(tests))
+            fetch.start()
+
+    def _is_fetching(self, test):
+        """Return whether a test is being fetched."""
+        return any(test in tests for tests in self._fetches.values())
+
+    def _on_finish(self, fetch):
+        """Register the fetched tests, and start the next fetches."""
+        tests = self._fetches.pop(fetch, ())
+        if not fetch.cancelled:
+            self._fetched.update(tests)
+
+        self._dispatch()
+
+    def _on_connection_error(self, _):
+        """Stop prefetching, the server can't be reached."""
+        self.enabled = False
+        self._heap = []
+        for fetch in list(self._fetches):
+            fetch.cancel()
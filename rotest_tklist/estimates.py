@@ -0,0 +1,206 @@
+"""Duration estimates of tests, rolled up from their components."""
+from collections import namedtuple
+
+from rotest.core import TestCase, TestFlow, MODE_CRITICAL, MODE_FINALLY
+
+
+STATISTICS = ('min', 'avg', 'max')
+
+Estimate = namedtuple('Estimate', STATISTICS + ('known', 'missing'))
+Estimate.__doc__ = """Estimated duration statistics of a test, in seconds.
+
+The statistics are sums over the test's parts (methods of a case, or blocks
+of a flow) that have history, 'known' and 'missing' count the parts with
+and without history.
+"""
+
+
+def _get_mode(component):
+    """Return the mode a flow component runs in."""
+    return component.common.get('mode', component.mode)
+
+
+def get_test_names(test):
+    """Return the names a test's statistics are kept under."""
+    if issubclass(test, TestCase):
+        return [test.get_name(method_name) for method_name in
+                test.load_test_method_names()]
+
+    return [test.get_name()]
+
+
+def find_names(tests):
+    """Find the names of the tests' statistics in advance.
+
+    Finding a case's method names is the slow part of estimating it, and
+    doesn't depend on the cache, so it may be done in a background thread.
+    The estimator isn't touched, the found names are added to it later
+    from its own thread (see DurationEstimator.add_names).
+
+    Args:
+        tests (iterable): test classes to find the names of.
+
+    Returns:
+        dict. test class -> the names its statistics are kept under.
+    """
+    return {test: get_test_names(test) for test in tests}
+
+
+class DurationEstimator(object):
+    """Numeric duration estimates of tests, from the durations cache.
+
+    Cases are estimated by summing their methods' statistics. Blocks and
+    flows are estimated by their own statistics, and flows without history
+    by rolling up their blocks' estimates (see roll_up). The estimates are
+    memoized per class, so shared sub-flows are rolled up once. When
+    durations change, only the estimates of the tests with the changed names
+    and of the flows containing them are forgotten (see invalidate). The
+    estimator is used from a single thread.
+
+    Attributes:
+        cache (DurationsCache): cache of the durations statistics.
+    """
+    def __init__(self, cache):
+        self.cache = cache
+        self._estimates = {}
+        self._roll_ups = {}
+        self._names = {}  # test -> names its statistics are kept under
+        self._name_to_tests = {}
+        self._parents = {}  # component -> flows rolled up from it
+
+    def clear(self):
+        """Forget all the estimates."""
+        self._estimates.clear()
+        self._roll_ups.clear()
+
+    def invalidate(self, names):
+        """Forget the estimates that depend on the statistics of names.
+
+        Args:
+            names (iterable): names whose cached statistics changed.
+        """
+        stale = [test for name in names
+                 for test in self._name_to_tests.get(name, ())]
+        forgotten = set()
+        while stale:
+            test = stale.pop()
+            if test not in forgotten:
+                forgotten.add(test)
+                self._estimates.pop(test, None)
+                self._roll_ups.pop(test, None)
+                stale.extend(self._parents.get(test, ()))
+
+    def add_names(self, names):
+        """Add names of tests' statistics that were found in advance.
+
+        Args:
+            names (dict): test class -> the names its statistics are kept
+                under, as returned by find_names.
+        """
+        for test, test_names in names.items():
+            if test not in self._names:
+                self._add_names(test, test_names)
+
+    def _add_names(self, test, names):
+        """Map a test to the names of its statistics and back."""
+        for name in names:
+            self._name_to_tests.setdefault(name, set()).add(test)
+
+        self._names[test] = names
+
+    def _get_names(self, test):
+        """Return the names a test's statistics are kept under."""
+        if test not in self._names:
+            self._add_names(test, get_test_names(test))
+
+        return self._names[test]
+
+    def get_measured(self, test):
+        """Return the estimate of a test from its own statistics.
+
+        Args:
+            test (type): test, block or flow class.
+
+        Returns:
+            Estimate. the summed statistics of the test's names.
+        """
+        totals = dict.fromkeys(STATISTICS, 0.0)
+        known = 0
+        names = self._get_names(test)
+        for name in names:
+            entry = self.cache.get(name)
+            if entry is None or entry.statistics is None or \
+                    not all(key in entry.statistics for key in STATISTICS):
+                continue
+
+            known += 1
+            for key in STATISTICS:
+                totals[key] += entry.statistics[key]
+
+        return Estimate(known=known, missing=len(names) - known, **totals)
+
+    def roll_up(self, flow):
+        """Return the estimate of a flow from its blocks' estimates.
+
+        The average and maximal durations are sums over all the blocks. The
+        minimal duration assumes the first critical block fails, so only the
+        blocks up to it and the later finally blocks run.
+
+        Args:
+            flow (type): flow class.
+
+        Returns:
+            Estimate. the rolled up estimate.
+        """
+        if flow not in self._roll_ups:
+            totals = dict.fromkeys(STATISTICS, 0.0)
+            known = missing = 0
+            failed = False
+            for block in flow.blocks:
+                self._parents.setdefault(block, set()).add(flow)
+                estimate = self.estimate(block)
+                known += estimate.known
+                missing += estimate.missing
+                totals['avg'] += estimate.avg
+                totals['max'] += estimate.max
+                if not failed or _get_mode(block) == MODE_FINALLY:
+                    totals['min'] += estimate.min
+
+                if _get_mode(block) == MODE_CRITICAL:
+                    failed = True
+
+            self._roll_ups[flow] = Estimate(known=known, missing=missing,
+                                            **totals)
+
+        return self._roll_ups[flow]
+
+    def estimate(self, test):
+        """Return the estimated duration of a test.
+
+        Args:
+            test (type): test, block or flow class.
+
+        Returns:
+            Estimate. the test's own statistics if it has history, or its
+                blocks' rolled up estimate for flows without history.
+        """
+        if test not in self._estimates:
+            estimate = self.get_measured(test)
+            if not estimate.known and issubclass(test, TestFlow):
+                estimate = self.roll_up(test)
+
+            self._estimates[test] = estimate
+
+        return self._estimates[test]
+
+
+def format_estimate(estimate):
+    """Return a short display string of an estimate's average.
+
+    Partial estimates (with parts without history) are marked by '~'.
+    """
+    if not estimate.known:
+        return ""
+
+    return "{}{:.1f} min".format("~" if estimate.missing else "",
+                                 estimate.avg / 60.0)
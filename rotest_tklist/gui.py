@@ -0,0 +1,1401 @@
+"""Tkinter tests explorer."""
+import queue
+import threading
+from functools import partial
+from collections import OrderedDict
+
+import tkinter as tk
+from tkinter import ttk
+from tkinter import font as tkfont
+from rotest.core import TestCase, TestFlow, TestSuite
+
+from rotest_tklist.profiling import TIMINGS
+from rotest_tklist.report import analyze_flow
+from rotest_tklist.watch import ModulesWatcher
+from rotest_tklist.snapshot import AnalysisSnapshot
+from rotest_tklist.resources import (ResourceIndex, get_requests,
+                                     forget_requests)
+from rotest_tklist.search import TestsIndex, get_resource_types
+from rotest_tklist.durations import DurationsManager
+from rotest_tklist.estimates import find_names, format_estimate
+from rotest_tklist.dependencies import FlowDependencies
+from rotest_tklist.analysis import FlowComponentData, MODE_TO_STRING
+
+
+TEXTBOX_WIDTH = 80
+TEXTBOX_HEIGHT = 36
+ERROR_TAG = 'error'
+ERROR_COLOR = 'red'
+TREE_PADDING = 40
+SNAPSHOT_FLUSH_INTERVAL = 1000
+DESCRIPTIONS_CAPACITY = 500
+SCROLL_EVENT = '<<TreeviewScrolled>>'
+# Minimal number of connectivity errors -> row color, in ascending order
+HEAT_COLORS = ((1, '#ffd8d8'), (3, '#ffa8a8'), (10, '#ff7878'))
+
+
+def tk_list_tests(tests, watch=False):
+    """Show the tests explorer main window, until it's closed."""
+    create_explorer(tests, watch).mainloop()
+
+
+def create_explorer(tests, watch=False):
+    """Create the tests explorer main window.
+
+    Args:
+        tests (list): test classes to list.
+        watch (bool): whether to reload the tests' modules when they change
+            on disk, see TestsReloader.
+
+    Returns:
+        tkinter.Tk. the explorer's window.
+    """
+    with TIMINGS.span("startup"):
+        return _create_explorer(tests, watch)
+
+
+def _create_explorer(tests, watch):
+    """Create the tests explorer main window (see create_explorer)."""
+    tests = list(tests)
+    window = tk.Tk()
+    DurationsManager.start_prefetching(window)
+    StatusBar(window).label.pack(side=tk.BOTTOM, fill=tk.X)
+    tab_control = ttk.Notebook(window)
+    tab_control.bind("<ButtonRelease-1>", partial(forget_children_tabs,
+                                                  tab_control=tab_control))
+
+    main_tab = ttk.Frame(tab_control)
+    tab_control.add(main_tab, text='Main')
+    tab_control.pack(expand=1, fill='both')
+
+    list_frame = ttk.Frame(main_tab)
+    list_frame.grid(column=0, row=1, sticky=tk.N+tk.S)
+    desc_frame = ttk.Frame(main_tab)
+    desc_frame.grid(column=1, row=0, sticky=tk.N, rowspan=2)
+    main_tab.rowconfigure(1, weight=1)
+
+    desc = tk.Text(desc_frame, width=TEXTBOX_WIDTH, height=TEXTBOX_HEIGHT)
+    desc.grid(column=0, row=0)
+    get_time_button = tk.Button(desc_frame, text="Calculate durations")
+    get_time_button.grid(column=0, row=1, sticky=tk.W+tk.E)
+    get_time_button.bind("<Button-1>", partial(
+                                            DurationsManager.calculate_times,
+                                            tests=tests))
+    resources_tab = ResourcesTab(tab_control, tests)
+    resources_button = tk.Button(desc_frame, text="Resource demand",
+                                 command=resources_tab.show)
+    resources_button.grid(column=0, row=2, sticky=tk.W+tk.E)
+
+    tests_tree = _create_tree(list_frame,
+                              [test.__name__ for test in tests],
+                              DurationColumn.COLUMNS)
+    iid_to_test = {}
+    test_to_iid = {}
+    for test in tests:
+        iid = tests_tree.insert('', tk.END, text=test.__name__)
+        iid_to_test[iid] = test
+        test_to_iid[test] = iid
+
+    search = SearchBar(main_tab, tests_tree, TestsIndex(tests), test_to_iid)
+    search.entry.grid(column=0, row=0, sticky=tk.W+tk.E)
+    durations = DurationColumn(list_frame, tests_tree, search, test_to_iid)
+    durations.total.grid(column=0, row=2, columnspan=2, sticky=tk.W)
+
+    desc_pane = DescriptionPane(desc, partial(_describe_test, widget=desc))
+
+    def on_hover(iid):
+        desc_pane.show(iid_to_test.get(iid))
+        DurationsManager.prefetch_hovered(iid_to_test.get(iid))
+
+    def on_shown(iids):
+        shown = [iid_to_test[iid] for iid in iids if iid in iid_to_test]
+        durations.show(shown)
+        DurationsManager.prefetch_visible(shown)
+
+    TreeHover(tests_tree, on_hover)
+    VisibleRows(tests_tree, on_shown)
+    DurationsManager.add_listener(desc, lambda _: desc_pane.refresh())
+    DurationsManager.add_listener(search.entry, search.update)
+    DurationsManager.add_listener(tests_tree, durations.refresh)
+    tabs = TabsCache(tab_control)
+    tests_tree.bind("<Button-1>", partial(_explore_tree_item,
+                                          tabs=tabs,
+                                          iid_to_test=iid_to_test))
+
+    progress = ttk.Progressbar(list_frame, maximum=max(len(tests), 1))
+    progress.grid(column=0, row=1, columnspan=2, sticky=tk.W+tk.E)
+
+    def on_error(test, error):
+        if test not in test_to_iid:
+            return  # Replaced by reloading its module
+
+        test._tklist_error = error
+        tests_tree.item(test_to_iid[test], tags=(ERROR_TAG,))
+        search.update(test)
+        if desc_pane.current is test:
+            desc_pane.refresh()
+
+    for index, (_, color) in enumerate(HEAT_COLORS):
+        tests_tree.tag_configure(_heat_tag(index), background=color)
+
+    snapshot = AnalysisSnapshot(None if AnalysisSnapshot.ENABLED
+                                else ':memory:')
+
+    def flush_snapshot():
+        snapshot.flush()
+        window.after(SNAPSHOT_FLUSH_INTERVAL, flush_snapshot)
+
+    flush_snapshot()
+    window.bind("<Destroy>", lambda event: snapshot.flush()
+                if event.widget is window else None)
+
+    def on_validated(results):
+        for test, error in results:
+            snapshot.update(test, 'validation', error)
+
+    def on_flow_analyzed(flow, summary):
+        snapshot.update(flow, 'flow_analysis', summary)
+        show_flow_errors(flow, summary)
+
+    def show_flow_errors(flow, summary):
+        errors = summary["errors"]
+        if not errors or flow not in test_to_iid:
+            return
+
+        flow._tklist_flow_errors = errors
+        iid = test_to_iid[flow]
+        tests_tree.item(iid, text="{} [{}]".format(flow.__name__,
+                                                   len(errors)))
+        if not hasattr(flow, '_tklist_error'):
+            tests_tree.item(iid, tags=(_heat_tag(_heat_level(len(errors))),))
+
+        search.update(flow)
+        if desc_pane.current is flow:
+            desc_pane.refresh()
+
+    def on_progress(validated):
+        progress.config(value=validated)
+        if validated == len(tests):
+            progress.grid_remove()
+
+    def analyze(tests_to_analyze, on_analysis_progress):
+        snapshot_results = snapshot.load(tests_to_analyze)
+        to_validate = []
+        to_analyze = []
+        for test in tests_to_analyze:
+            results = snapshot_results.get(test, {})
+            if 'validation' not in results:
+                to_validate.append(test)
+
+            elif results['validation'] is not None:
+                on_error(test, results['validation'])
+
+            if 'flow_analysis' in results:
+                show_flow_errors(test, results['flow_analysis'])
+
+            elif issubclass(test, TestFlow):
+                to_analyze.append(test)
+
+        loaded = len(tests_to_analyze) - len(to_validate)
+        on_analysis_progress(loaded)
+        SuiteValidator(window, to_validate, on_error,
+                       lambda validated: on_analysis_progress(
+                                                    loaded + validated),
+                       on_validated).start()
+        FlowsAnalyzer(window, to_analyze, on_flow_analyzed).start()
+        return snapshot_results
+
+    def on_resources(resource_types):
+        resource_types = {test: types
+                          for test, types in resource_types.items()
+                          if test in test_to_iid}
+        for test, types in resource_types.items():
+            snapshot.update(test, 'resource_types', types)
+
+        search.add_resources(resource_types)
+
+    def on_reload(result):
+        for test, new_test in result.replaced.items():
+            iid = test_to_iid.pop(test)
+            iid_to_test[iid] = new_test
+            test_to_iid[new_test] = iid
+            tests[tests.index(test)] = new_test
+            tests_tree.item(iid, text=new_test.__name__, tags=())
+            search.replace(test, new_test)
+            tabs.replace(test, new_test)
+            durations.refresh()
+            if desc_pane.current is test:
+                desc_pane.show(new_test)
+
+        for test, error in result.errors.items():
+            on_error(test, error)
+
+        resources_tab.invalidate()
+
+        analyze(list(result.replaced.values()), lambda _: None)
+
+    snapshot_results = analyze(tests, on_progress)
+    search.add_resources({test: results['resource_types']
+                          for test, results in snapshot_results.items()
+                          if 'resource_types' in results})
+    BackgroundTask(window, partial(get_resource_types,
+                                   [test for test in tests
+                                    if 'resource_types' not in
+                                    snapshot_results.get(test, {})]),
+                   on_resources).start()
+    if watch:
+        TestsReloader(window, tests, on_reload).start()
+
+    return window
+
+
+def _heat_tag(level):
+    """Return the tree tag of rows with the given level of errors."""
+    return 'heat{}'.format(level)
+
+
+def _heat_level(errors_count):
+    """Return the index in HEAT_COLORS matching a number of errors."""
+    level = 0
+    for index, (minimum, _) in enumerate(HEAT_COLORS):
+        if errors_count >= minimum:
+            level = index
+
+    return level
+
+
+def _validate_test(test):
+    """Try to build a suite of the test to find configuration errors.
+
+    Args:
+        test (type): test class to validate.
+
+    Returns:
+        str. the validation error, or None if the test is valid.
+    """
+    try:
+        TestSuite(tests=[test],
+                  run_data=None,
+                  config=None,
+                  skip_init=False,
+                  save_state=False,
+                  enable_debug=False,
+                  resource_manager=False)
+
+    except Exception as error:  # pylint: disable=broad-except
+        return str(error) or type(error).__name__
+
+    return None
+
+
+class BackgroundStream(object):
+    """Produce results in a background thread, and handle them in Tk.
+
+    The results are collected in batches by polling from the Tk main loop,
+    since widgets may only be updated from the thread that created them.
+    The polling stops once all the results were handled (or the producer
+    failed), or when the widget is destroyed.
+
+    Attributes:
+        POLL_INTERVAL (number): milliseconds between results collections.
+        widget (tkinter.Widget): widget to schedule the polling with.
+        produce (callable): returns an iterable of the results, which is
+            iterated in the background thread.
+        on_results (callable): called with the list of each batch of
+            results.
+    """
+    POLL_INTERVAL = 100
+
+    _DONE = object()
+
+    def __init__(self, widget, produce, on_results):
+        self.widget = widget
+        self.produce = produce
+        self.on_results = on_results
+        self._results = queue.Queue()
+
+    def start(self):
+        """Start the background thread and the results polling."""
+        thread = threading.Thread(target=self._run)
+        thread.daemon = True
+        thread.start()
+        self.widget.after(self.POLL_INTERVAL, self._poll)
+
+    def _run(self):
+        """Queue the produced results (worker thread)."""
+        try:
+            for result in self.produce():
+                self._results.put(result)
+
+        finally:
+            self._results.put(self._DONE)
+
+    def _poll(self):
+        """Handle the queued results and reschedule if not done."""
+        if not self.widget.winfo_exists():
+            return
+
+        results = []
+        done = False
+        while not done:
+            try:
+                result = self._results.get_nowait()
+
+            except queue.Empty:
+                break
+
+            done = result is self._DONE
+            if not done:
+                results.append(result)
+
+        if results:
+            self.on_results(results)
+
+        if not done:
+            self.widget.after(self.POLL_INTERVAL, self._poll)
+
+
+class SuiteValidator(BackgroundStream):
+    """Validate tests in a background thread, reporting back in batches.
+
+    The validation runs in a worker thread so the window can be shown right
+    away.
+
+    Attributes:
+        tests (list): test classes to validate.
+        on_error (callable): called with a test class and its error string.
+        on_progress (callable): called with the number of validated tests.
+        on_batch (callable): called with the list of (test class, error)
+            pairs of each batch of results, error being None for valid tests.
+        validated (number): number of tests validated so far.
+    """
+    def __init__(self, widget, tests, on_error, on_progress, on_results=None):
+        super(SuiteValidator, self).__init__(widget, self._validate_all,
+                                             self._handle)
+        self.tests = list(tests)
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_batch = on_results
+        self.validated = 0
+
+    def _validate_all(self):
+        """Validate the tests, yielding the results (worker thread)."""
+        for test in self.tests:
+            with TIMINGS.span("validation"):
+                error = _validate_test(test)
+
+            yield test, error
+
+    def _handle(self, results):
+        """Report a batch of validation results."""
+        for test, error in results:
+            if error is not None:
+                self.on_error(test, error)
+
+        self.validated += len(results)
+        self.on_progress(self.validated)
+        if self.on_batch is not None:
+            self.on_batch(results)
+
+
+class FlowsAnalyzer(BackgroundStream):
+    """Analyze the connectivity of all the flows in the background.
+
+    The flows are analyzed in the background thread itself, since forking
+    worker processes while Tk and the other threads run isn't safe.
+
+    Attributes:
+        flows (list): flow classes to analyze.
+        on_result (callable): called with a flow class and the summary of
+            its analysis (see analyze_flow).
+        analyzed (number): number of flows analyzed so far.
+    """
+    def __init__(self, widget, flows, on_result):
+        super(FlowsAnalyzer, self).__init__(widget, self._analyze_all,
+                                            self._handle)
+        self.flows = list(flows)
+        self.on_result = on_result
+        self.analyzed = 0
+
+    def start(self):
+        """Start the analysis thread and the results polling."""
+        if self.flows:
+            super(FlowsAnalyzer, self).start()
+
+    def _analyze_all(self):
+        """Analyze the flows, yielding the results (worker thread)."""
+        for flow in self.flows:
+            yield flow, analyze_flow(flow)
+
+    def _handle(self, results):
+        """Report a batch of analysis summaries."""
+        for flow, summary in results:
+            self.analyzed += 1
+            self.on_result(flow, summary)
+
+
+class TestsReloader(object):
+    """Reload the tests' modules when they change, see ModulesWatcher.
+
+    The modules' files are checked periodically from the Tk main loop. Only
+    the changed modules, and the modules of the flows that contain their
+    components, are reloaded.
+
+    Attributes:
+        POLL_INTERVAL (number): milliseconds between files checks.
+        widget (tkinter.Widget): widget to schedule the checks with.
+        watcher (ModulesWatcher): tracks and reloads the modules.
+        on_reload (callable): called with the ReloadResult of each reload.
+    """
+    POLL_INTERVAL = 1000
+
+    def __init__(self, widget, tests, on_reload):
+        self.widget = widget
+        self.watcher = ModulesWatcher(tests)
+        self.on_reload = on_reload
+
+    def start(self):
+        """Start checking for changes."""
+        self.widget.after(self.POLL_INTERVAL, self._poll)
+
+    def _poll(self):
+        """Reload the changed modules, if any, and reschedule."""
+        if not self.widget.winfo_exists():
+            return
+
+        changed = self.watcher.get_changed()
+        if changed:
+            with TIMINGS.span("reload"):
+                result = self.watcher.reload(changed)
+                FlowComponentData.forget(result.affected)
+                forget_requests(result.affected)
+                for component in result.affected:
+                    _DESCRIPTIONS.pop(component, None)
+
+            TIMINGS.count("reloaded modules", len(changed))
+            self.on_reload(result)
+
+        self.widget.after(self.POLL_INTERVAL, self._poll)
+
+
+class StatusBar(object):
+    """Label showing the phases timings and the counters, see Timings.
+
+    Attributes:
+        REFRESH_INTERVAL (number): milliseconds between refreshes.
+        label (ttk.Label): the status bar's label.
+    """
+    REFRESH_INTERVAL = 1000
+
+    def __init__(self, window):
+        self.label = ttk.Label(window, anchor=tk.W, relief=tk.SUNKEN)
+        self._refresh()
+
+    def _refresh(self):
+        """Show the current timings, and reschedule."""
+        if self.label.winfo_exists():
+            self.label.config(text=TIMINGS.format_status())
+            self.label.after(self.REFRESH_INTERVAL, self._refresh)
+
+
+class BackgroundTask(BackgroundStream):
+    """Run a function in a background thread, and handle its result in Tk.
+
+    Attributes:
+        function (callable): function to run in the background.
+        callback (callable): called from the Tk main loop with the result.
+    """
+    def __init__(self, widget, function, callback):
+        super(BackgroundTask, self).__init__(
+                                    widget, lambda: [function()],
+                                    lambda results: callback(results[0]))
+        self.function = function
+        self.callback = callback
+
+
+def _create_tree(frame, texts, columns=()):
+    """Create a scrollable tree view to list items in.
+
+    The tree view only draws the rows that are currently visible, so it stays
+    responsive no matter how many items are inserted into it. It generates
+    SCROLL_EVENT whenever its visible part changes.
+
+    Args:
+        frame (tkinter.Frame): frame to put the tree and its scrollbar in.
+        texts (list): the texts that will be shown, used to fit the width.
+        columns (tuple): (name, heading) pairs of values columns to show
+            beside the items' texts, with headings.
+
+    Returns:
+        ttk.Treeview. the created tree view.
+    """
+    tree = ttk.Treeview(frame, show='tree headings' if columns else 'tree',
+                        columns=[name for name, _ in columns],
+                        selectmode='browse', height=TEXTBOX_HEIGHT)
+    for name, heading in columns:
+        tree.heading(name, text=heading)
+        tree.column(name, width=tkfont.nametofont('TkDefaultFont').measure(
+                                            heading) + TREE_PADDING)
+
+    scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
+
+    def on_scroll(first, last):
+        scrollbar.set(first, last)
+        tree.event_generate(SCROLL_EVENT)
+
+    tree.configure(yscrollcommand=on_scroll)
+    tree.grid(column=0, row=0, sticky=tk.N+tk.S+tk.W+tk.E)
+    scrollbar.grid(column=1, row=0, sticky=tk.N+tk.S)
+    frame.rowconfigure(0, weight=1)
+
+    if texts:
+        font = tkfont.nametofont('TkDefaultFont')
+        width = font.measure(max(texts, key=len)) + TREE_PADDING
+        tree.column('#0', width=width, minwidth=width)
+
+    tree.tag_configure(ERROR_TAG, background=ERROR_COLOR)
+    return tree
+
+
+class TreeHover(object):
+    """Track the row under the mouse cursor in a tree view.
+
+    Attributes:
+        tree (ttk.Treeview): tree view to track.
+        callback (callable): called with the hovered item id, or None when
+            the cursor leaves the items.
+        current (str): id of the currently hovered item.
+    """
+    def __init__(self, tree, callback):
+        self.tree = tree
+        self.callback = callback
+        self.current = None
+        self.tree.bind("<Motion>", self._on_motion)
+        self.tree.bind("<Leave>", self._on_leave)
+
+    def _on_motion(self, event):
+        """Notify the callback if the cursor moved to another row."""
+        iid = self.tree.identify_row(event.y) or None
+        if iid != self.current:
+            self.current = iid
+            self.callback(iid)
+
+    def _on_leave(self, _):
+        """Notify the callback that no row is hovered."""
+        if self.current is not None:
+            self.current = None
+            self.callback(None)
+
+
+def _iterate_shown_items(tree):
+    """Yield the ids of the rows currently shown in a tree view's viewport."""
+    iid = None
+    for y in range(0, tree.winfo_height(), 4):
+        # Skips the headings, if shown
+        iid = tree.identify_row(y)
+        if iid:
+            break
+
+    while iid and tree.bbox(iid):
+        yield iid
+        if tree.item(iid, 'open') and tree.get_children(iid):
+            iid = tree.get_children(iid)[0]
+            continue
+
+        while iid and not tree.next(iid):
+            iid = tree.parent(iid)
+
+        iid = iid and tree.next(iid)
+
+
+class VisibleRows(object):
+    """Track the rows shown in a tree view's viewport.
+
+    The rows are found again when Tk is idle after the tree view scrolled,
+    was resized or its rows changed, so scrolling quickly finds them once.
+
+    Attributes:
+        tree (ttk.Treeview): tree view to track, created by _create_tree.
+        callback (callable): called with the list of the shown item ids,
+            when they change.
+        current (list): ids of the currently shown items.
+    """
+    def __init__(self, tree, callback):
+        self.tree = tree
+        self.callback = callback
+        self.current = []
+        self._scheduled = False
+        for sequence in (SCROLL_EVENT, "<Configure>", "<<TreeviewOpen>>",
+                         "<<TreeviewClose>>"):
+            self.tree.bind(sequence, self._schedule, add='+')
+
+    def _schedule(self, _=None):
+        """Find the shown rows when Tk is idle, unless already scheduled."""
+        if not self._scheduled:
+            self._scheduled = True
+            self.tree.after_idle(self._update)
+
+    def _update(self):
+        """Notify the callback if the shown rows changed."""
+        self._scheduled = False
+        if not self.tree.winfo_exists():
+            return
+
+        shown = list(_iterate_shown_items(self.tree))
+        if shown != self.current:
+            self.current = shown
+            self.callback(shown)
+
+
+class SearchBar(object):
+    """Entry filtering the rows of the tests tree view by a search query.
+
+    The query syntax is described in TestsIndex. The rows are filtered when
+    Tk is idle, so typing quickly filters only once. An invalid query is
+    shown in the error color, and leaves the rows as they are.
+
+    Attributes:
+        tree (ttk.Treeview): tree view of the tests.
+        index (TestsIndex): index of the listed tests.
+        test_to_iid (dict): test class -> its item id in the tree.
+        query (tkinter.StringVar): the query in the entry.
+        entry (tkinter.Entry): the search entry.
+        sort_key (callable): key to order the matching tests by, or None to
+            keep their original order.
+        on_filter (callable): called with the matching tests after
+            filtering, or None.
+    """
+    def __init__(self, frame, tree, index, test_to_iid):
+        self.tree = tree
+        self.index = index
+        self.test_to_iid = test_to_iid
+        self.sort_key = None
+        self.on_filter = None
+        self.query = tk.StringVar(frame)
+        self.entry = tk.Entry(frame, textvariable=self.query)
+        self._foreground = self.entry.cget('foreground')
+        self._scheduled = False
+        self.query.trace_add('write', lambda *_: self.refresh())
+
+    def update(self, test):
+        """Index the new state of a test, and filter again if needed."""
+        self.index.update(test)
+        if self.query.get().strip():
+            self.refresh()
+
+    def replace(self, test, new_test):
+        """Index the new class of a reloaded test, and filter again."""
+        self.index.replace(test, new_test,
+                           get_resource_types([new_test])[new_test])
+        self.refresh()
+
+    def add_resources(self, resource_types):
+        """Index the tests' resources, and filter again if needed."""
+        self.index.add_resources(resource_types)
+        if self.query.get().strip():
+            self.refresh()
+
+    def refresh(self):
+        """Schedule filtering the rows by the current query."""
+        if not self._scheduled:
+            self._scheduled = True
+            self.entry.after_idle(self._filter)
+
+    def _filter(self):
+        """Show only the rows of the tests matching the query."""
+        self._scheduled = False
+        try:
+            tests = self.index.search(self.query.get())
+
+        except ValueError:
+            self.entry.config(foreground=ERROR_COLOR)
+            return
+
+        self.entry.config(foreground=self._foreground)
+        if self.sort_key is not None:
+            tests.sort(key=self.sort_key)
+
+        # Replacing the children list detaches the rest in a single call
+        self.tree.set_children('', *[self.test_to_iid[test]
+                                     for test in tests])
+        if self.on_filter is not None:
+            self.on_filter(tests)
+
+
+class DurationColumn(object):
+    """Estimated durations of the listed tests, see DurationEstimator.
+
+    Shows the estimates of the shown rows in a column of the tests tree
+    view (see show), and the total estimate of the listed (matching) tests
+    in a label. Finding the cases' method names is slow for large suites, so
+    it's done in the background, and the total is shown when it's done.
+    Clicking the column's heading sorts the tests by their estimates,
+    longest first, or back to their original order. Refreshes are
+    coalesced, to when Tk is idle.
+
+    Attributes:
+        COLUMNS (tuple): the columns to create the tree view with.
+        tree (ttk.Treeview): tree view of the tests.
+        search (SearchBar): the search bar filtering the tree view.
+        test_to_iid (dict): test class -> its item id in the tree.
+        total (ttk.Label): label showing the total estimate.
+        shown (list): the tests in the shown rows.
+    """
+    COLUMNS = (('duration', 'Duration'),)
+
+    def __init__(self, frame, tree, search, test_to_iid):
+        self.tree = tree
+        self.search = search
+        self.test_to_iid = test_to_iid
+        self.total = ttk.Label(frame, text="Total: estimating...")
+        self.shown = []
+        self._listed = list(test_to_iid)
+        self._names_loaded = False
+        self._scheduled = False
+        self.tree.heading('duration', command=self._toggle_sort)
+        self.search.on_filter = self._on_filter
+        BackgroundTask(tree, partial(find_names, list(test_to_iid)),
+                       self._on_names_loaded).start()
+
+    def show(self, tests):
+        """Show the estimates of the tests in the shown rows.
+
+        Args:
+            tests (list): the tests in the rows shown in the tree view.
+        """
+        self.shown = tests
+        self._set_estimates()
+
+    def refresh(self, _=None):
+        """Schedule updating the estimates, e.g. after durations changed."""
+        if not self._scheduled:
+            self._scheduled = True
+            self.tree.after_idle(self._update)
+
+    def _update(self):
+        """Update the shown estimates, and the order or total."""
+        self._scheduled = False
+        if not self.tree.winfo_exists():
+            return
+
+        self._set_estimates()
+        if self.search.sort_key is not None:
+            self.search.refresh()  # The order may have changed
+
+        else:
+            self._show_total()
+
+    def _set_estimates(self):
+        """Set the estimates of the shown rows."""
+        estimator = DurationsManager.get_estimator()
+        for test in self.shown:
+            if test in self.test_to_iid:  # Unless replaced by a reload
+                self.tree.set(self.test_to_iid[test], 'duration',
+                              format_estimate(estimator.estimate(test)))
+
+    def _on_names_loaded(self, names):
+        """Show the total, now that estimating all the tests is fast."""
+        DurationsManager.get_estimator().add_names(names)
+        self._names_loaded = True
+        self._show_total()
+
+    def _toggle_sort(self):
+        """Sort the tests by their estimates, or back to their order."""
+        if self.search.sort_key is None:
+            self.search.sort_key = self._sort_key
+            self.tree.heading('duration', text='Duration (sorted)')
+
+        else:
+            self.search.sort_key = None
+            self.tree.heading('duration', text='Duration')
+
+        self.search.refresh()
+
+    @staticmethod
+    def _sort_key(test):
+        """Return a key ordering tests by their estimates, longest first."""
+        estimate = DurationsManager.get_estimator().estimate(test)
+        return (not estimate.known, -estimate.avg)
+
+    def _on_filter(self, tests):
+        """Keep the listed tests, and show their total estimate."""
+        self._listed = tests
+        self._show_total()
+
+    def _show_total(self):
+        """Show the total estimate of the listed tests, once possible."""
+        if not self._names_loaded:
+            return
+
+        estimator = DurationsManager.get_estimator()
+        estimates = [estimator.estimate(test) for test in self._listed]
+        partial_count = sum(1 for estimate in estimates if estimate.missing)
+        self.total.config(text="Total: {:.1f} min for {} tests ({} partially "
+                               "or not estimated)".format(
+                                    sum(estimate.avg
+                                        for estimate in estimates) / 60.0,
+                                    len(self._listed), partial_count))
+
+
+def _explore_tree_item(event, tabs, iid_to_test):
+    """Show the tab of the test in the clicked row of a tree view."""
+    iid = event.widget.identify_row(event.y)
+    if iid in iid_to_test:
+        tabs.show(iid_to_test[iid])
+
+
+class TabsCache(object):
+    """LRU cache of the tabs of explored tests.
+
+    Building a tab may require analyzing a flow and creating many widgets,
+    so the built tabs are kept (even when removed from the notebook), and
+    showing a test again just re-adds its tab. The widgets of the least
+    recently shown tabs are destroyed when the capacity is exceeded.
+
+    Attributes:
+        CAPACITY (number): default maximal number of tabs to keep.
+        tab_control (ttk.Notebook): notebook to show the tabs in.
+        capacity (number): maximal number of tabs to keep.
+    """
+    CAPACITY = 10
+
+    def __init__(self, tab_control, capacity=None):
+        self.tab_control = tab_control
+        self.capacity = capacity if capacity is not None else self.CAPACITY
+        self._tabs = OrderedDict()  # test class -> tab frame
+
+    def show(self, test):
+        """Add the tab of the test to the notebook and select it.
+
+        Args:
+            test (type): test class to show.
+        """
+        tab = self._tabs.pop(test, None)
+        if tab is None:
+            TIMINGS.count("tabs cache misses")
+            tab = _explore_subtest(self.tab_control, test)
+
+        else:
+            TIMINGS.count("tabs cache hits")
+
+        self._tabs[test] = tab
+        if str(tab) not in self.tab_control.tabs():
+            self.tab_control.add(tab, text=test.__name__)
+
+        self.tab_control.select(tab)
+        while len(self._tabs) > max(self.capacity, 1):
+            _, evicted = self._tabs.popitem(last=False)
+            if str(evicted) in self.tab_control.tabs():
+                self.tab_control.forget(evicted)
+
+            evicted.destroy()
+
+    def replace(self, test, new_test):
+        """Rebuild the tab of a test for its new class, in the same place.
+
+        Args:
+            test (type): test class whose tab may be kept.
+            new_test (type): the class replacing it, e.g. after reloading.
+        """
+        tab = self._tabs.pop(test, None)
+        if tab is None:
+            return
+
+        new_tab = _explore_subtest(self.tab_control, new_test)
+        self._tabs[new_test] = new_tab
+        if str(tab) in self.tab_control.tabs():
+            selected = self.tab_control.select() == str(tab)
+            self.tab_control.insert(tab, new_tab, text=new_test.__name__)
+            self.tab_control.forget(tab)
+            if selected:
+                self.tab_control.select(new_tab)
+
+        tab.destroy()
+
+
+class ResourcesTab(object):
+    """Tab showing the demand of the tests for resource types.
+
+    The ResourceIndex is built in the background when the tab is first
+    shown. Each type's row lists the kwargs it's requested with, and each of
+    those lists the requesting tests when it's expanded.
+
+    Attributes:
+        COLUMNS (tuple): the values columns of the types' rows.
+        tab_control (ttk.Notebook): notebook to show the tab in.
+        tests (list): the listed test classes.
+    """
+    COLUMNS = (('cases', 'Cases'), ('flows', 'Flows'),
+               ('requests', 'Requests'))
+
+    def __init__(self, tab_control, tests):
+        self.tab_control = tab_control
+        self.tests = tests
+        self._frame = None
+        self._tree = None
+        self._pending = {}  # item id -> tests to insert when it's opened
+
+    def invalidate(self):
+        """Build the index again when the tab is next shown."""
+        if self._frame is not None:
+            if str(self._frame) in self.tab_control.tabs():
+                self.tab_control.forget(self._frame)
+
+            self._frame.destroy()
+            self._frame = None
+
+    def show(self):
+        """Add the tab to the notebook and select it."""
+        if self._frame is None:
+            self._frame = ttk.Frame(self.tab_control)
+            self._tree = _create_tree(self._frame, [], self.COLUMNS)
+            self._tree.bind("<<TreeviewOpen>>", self._on_open)
+            self._tree.insert('', tk.END, text="Collecting...")
+            BackgroundTask(self._frame, partial(ResourceIndex,
+                                                list(self.tests)),
+                           self._fill).start()
+
+        if str(self._frame) not in self.tab_control.tabs():
+            self.tab_control.add(self._frame, text="Resources")
+
+        self.tab_control.select(self._frame)
+
+    def _fill(self, index):
+        """Insert the rows of the resource types' demands."""
+        self._tree.delete(*self._tree.get_children())
+        for demand in index.demands.values():
+            iid = self._tree.insert('', tk.END, text=demand.type_name,
+                                    values=(len(demand.cases),
+                                            len(demand.flows),
+                                            demand.requests))
+            for kwargs, tests in demand.variants.items():
+                variant = self._tree.insert(iid, tk.END, text=kwargs,
+                                            values=('', '', len(tests)))
+                # Makes the row expandable until the tests are inserted
+                self._tree.insert(variant, tk.END)
+                self._pending[variant] = tests
+
+    def _on_open(self, _):
+        """Insert the tests of the expanded row, if needed."""
+        iid = self._tree.focus()
+        tests = self._pending.pop(iid, None)
+        if tests is not None:
+            self._tree.delete(*self._tree.get_children(iid))
+            for test in tests:
+                self._tree.insert(iid, tk.END, text=test.__name__)
+
+
+class DependenciesTab(object):
+    """Tab showing the dependencies report of a flow.
+
+    The tab is created when it's first shown, and shown again (with the
+    report updated to the current durations) on later requests. It should
+    be destroyed along with the flow's tab.
+
+    Attributes:
+        tab_control (ttk.Notebook): notebook to show the tab in.
+        flow_data (FlowComponentData): the analyzed flow.
+    """
+    def __init__(self, tab_control, flow_data):
+        self.tab_control = tab_control
+        self.flow_data = flow_data
+        self._frame = None
+        self._text = None
+
+    def show(self):
+        """Add the tab to the notebook, update its report and select it."""
+        if self._frame is None:
+            self._frame = ttk.Frame(self.tab_control)
+            self._text = tk.Text(self._frame, width=TEXTBOX_WIDTH * 2,
+                                 height=TEXTBOX_HEIGHT, wrap=tk.NONE)
+            scrollbar = ttk.Scrollbar(self._frame, orient=tk.VERTICAL,
+                                      command=self._text.yview)
+            self._text.configure(yscrollcommand=scrollbar.set)
+            self._text.grid(column=0, row=0, sticky=tk.N+tk.S+tk.W+tk.E)
+            scrollbar.grid(column=1, row=0, sticky=tk.N+tk.S)
+
+        report = FlowDependencies(self.flow_data,
+                                  DurationsManager.get_estimator())
+        self._text.config(state=tk.NORMAL)
+        self._text.delete("1.0", tk.END)
+        self._text.insert(tk.END, report.format())
+        self._text.config(state=tk.DISABLED)
+        if str(self._frame) not in self.tab_control.tabs():
+            self.tab_control.add(self._frame, text="{} dependencies".format(
+                                                        self.flow_data.name))
+
+        self.tab_control.select(self._frame)
+
+    def destroy(self):
+        """Remove the tab from the notebook and destroy its widgets."""
+        if self._frame is not None:
+            if self._frame.winfo_exists():
+                if str(self._frame) in self.tab_control.tabs():
+                    self.tab_control.forget(self._frame)
+
+                self._frame.destroy()
+
+            self._frame = None
+            self._text = None
+
+
+def forget_children_tabs(_, tab_control):
+    """Remove the tabs to the right of the current one."""
+    current_index = tab_control.index(tk.CURRENT)
+    last_index = tab_control.index(tk.END) - 1
+    while last_index > current_index:
+        tab_control.hide(last_index)
+        tab_control.forget(last_index)
+        last_index -= 1
+
+    tab_control.pack()
+
+
+class DescriptionPane(object):
+    """Text widget showing the description of the hovered item.
+
+    Hover updates are coalesced: rendering is scheduled to when Tk is idle,
+    and only the item that was shown last is rendered then.
+
+    Attributes:
+        text (tkinter.Text): text widget to render into.
+        describe (callable): returns the description string of an item.
+        current (object): the item that is shown, or None.
+    """
+    def __init__(self, text, describe):
+        self.text = text
+        self.describe = describe
+        self.current = None
+        self._scheduled = False
+
+    def show(self, item):
+        """Schedule rendering the description of the item (None to clear)."""
+        self.current = item
+        if not self._scheduled:
+            self._scheduled = True
+            self.text.after_idle(self._render)
+
+    def refresh(self):
+        """Schedule rendering the description of the current item again."""
+        self.show(self.current)
+
+    def _render(self):
+        """Replace the text with the description of the current item."""
+        self._scheduled = False
+        if not self.text.winfo_exists():
+            return
+
+        self.text.delete("1.0", tk.END)
+        if self.current is not None:
+            self.text.insert(tk.END, self.describe(self.current))
+
+
+_DESCRIPTIONS = OrderedDict()  # item -> (key, description), LRU
+
+
+def _get_cached_description(item, test, create):
+    """Return the description of an item, creating it only if needed.
+
+    The descriptions are cached along with the duration and error of the
+    test they were created with, and are created again if those changed.
+    Only the DESCRIPTIONS_CAPACITY most recently shown ones are kept.
+
+    Args:
+        item (object): test class or flow component to describe.
+        test (type): the test class of the item.
+        create (callable): creates the description string.
+
+    Returns:
+        str. the description.
+    """
+    key = (getattr(test, '_tklist_duration', None),
+           _get_roll_up(test),
+           getattr(test, '_tklist_error', None),
+           len(getattr(test, '_tklist_flow_errors', ())))
+    cached = _DESCRIPTIONS.pop(item, None)
+    if cached is None or cached[0] != key:
+        cached = (key, create())
+
+    _DESCRIPTIONS[item] = cached
+    if len(_DESCRIPTIONS) > DESCRIPTIONS_CAPACITY:
+        _DESCRIPTIONS.popitem(last=False)
+
+    return cached[1]
+
+
+def _get_roll_up(test):
+    """Return the estimate of a flow rolled up from its blocks, or None."""
+    if issubclass(test, TestFlow):
+        return DurationsManager.get_estimator().roll_up(test)
+
+    return None
+
+
+def _describe_roll_up(test):
+    """Return the lines describing the rolled up estimate of a flow."""
+    estimate = _get_roll_up(test)
+    if estimate is None or not estimate.known:
+        return []
+
+    lines = ["Blocks estimate: {:.1f} min (min {:.1f}, max {:.1f})\n".format(
+                                                    estimate.avg / 60.0,
+                                                    estimate.min / 60.0,
+                                                    estimate.max / 60.0)]
+    if estimate.missing:
+        lines.append("    {} of {} components have no history\n".format(
+                        estimate.missing, estimate.known + estimate.missing))
+
+    return lines
+
+
+def _describe_resources(test):
+    """Return the lines describing the resources requests of a test."""
+    lines = ["Resource requests:\n"]
+    for request in get_requests(test):
+        lines.append("  {} = {}({})\n".format(request.name,
+                                              request.type.__name__,
+                                              request.kwargs))
+
+    return lines
+
+
+def _describe_test(test, widget):
+    """Return a description of the metadata of a test.
+
+    Args:
+        test (type): test class to describe.
+        widget (tkinter.Widget): widget to schedule the durations refresh
+            with, if they are cached but stale.
+
+    Returns:
+        str. the test's description.
+    """
+    DurationsManager.load_cached(test, widget)
+    return _get_cached_description(test, test,
+                                   partial(_create_test_description, test))
+
+
+def _create_test_description(test):
+    """Create the description of a test (see _describe_test)."""
+    lines = [test.__name__ + "\n",
+             "Tags: {}\n".format(test.TAGS),
+             "Timeout: {} min\n".format(test.TIMEOUT / 60.0)]
+    if hasattr(test, '_tklist_duration'):
+        lines.append("Duration: {}\n".format(test._tklist_duration))
+
+    lines.extend(_describe_roll_up(test))
+    lines.extend(_describe_resources(test))
+    lines.append("\n")
+    if test.__doc__:
+        lines.append(test.__doc__)
+
+    if hasattr(test, '_tklist_error'):
+        lines.append("\nErrors:\n{}".format(test._tklist_error))
+
+    if hasattr(test, '_tklist_flow_errors'):
+        lines.append("\nConnectivity errors:\n")
+        lines.extend("    {}: {}\n".format(error["component"], error["error"])
+                     for error in test._tklist_flow_errors)
+
+    return "".join(lines)
+
+
+def _explore_subtest(tab_control, test):
+    """Create a tab for the given test or test component.
+
+    Returns:
+        ttk.Frame. the tab's frame, not yet added to the notebook.
+    """
+    sub_tab = ttk.Frame(tab_control)
+    with TIMINGS.span("tabs creation"):
+        for class_key, explorer in _class_to_explorer.items():
+            if issubclass(test, class_key):
+                explorer(sub_tab, test)
+                break
+
+    return sub_tab
+
+
+def _explore_case(frame, test):
+    """Show metadata for a TestCase."""
+    list_frame = ttk.Frame(frame)
+    list_frame.grid(column=0, row=0, sticky=tk.N)
+    desc_frame = ttk.Frame(frame)
+    desc_frame.grid(column=1, row=0, sticky=tk.N)
+
+    desc = tk.Text(desc_frame, width=TEXTBOX_WIDTH, height=TEXTBOX_HEIGHT)
+    desc.grid(column=0, row=0)
+
+    get_time_button = tk.Button(desc_frame, text="Calculate durations")
+    get_time_button.grid(column=0, row=1, sticky=tk.W+tk.E)
+    get_time_button.bind("<Button-1>", partial(
+                                            DurationsManager.calculate_times,
+                                            tests=[test]))
+
+    methods = test.load_test_method_names()
+    desc_pane = DescriptionPane(desc, partial(_describe_test, widget=desc))
+    desc_pane.show(test)
+    DurationsManager.add_listener(desc, lambda _: desc_pane.refresh())
+
+    for index, method_name in enumerate(methods):
+        label = tk.Label(list_frame, text=test.get_name(method_name))
+        label.grid(column=0, row=index + 1, sticky=tk.W+tk.E)
+
+
+def _explore_flow(frame, test):
+    """Show metadata for a flow."""
+    list_frame = ttk.Frame(frame)
+    list_frame.grid(column=0, row=0, sticky=tk.N, rowspan=2)
+    desc_frame = ttk.Frame(frame)
+    desc_frame.grid(column=1, row=0, sticky=tk.N)
+    connection_frame = ttk.Frame(frame)
+    connection_frame.grid(column=1, row=1, sticky=tk.N)
+
+    desc = tk.Text(desc_frame, width=TEXTBOX_WIDTH, height=TEXTBOX_HEIGHT / 2)
+    desc.grid(column=0, row=0)
+
+    get_time_button = tk.Button(connection_frame, text="Calculate duration")
+    get_time_button.grid(column=0, row=1, sticky=tk.W+tk.E)
+    get_time_button.bind("<Button-1>", partial(
+                                            DurationsManager.calculate_times,
+                                            tests=[test],
+                                            recursive=False))
+    get_subtime_button = tk.Button(connection_frame, text="Calculate sub durations")
+    get_subtime_button.grid(column=1, row=1, sticky=tk.W+tk.E)
+    get_subtime_button.bind("<Button-1>", partial(
+                                            DurationsManager.calculate_times,
+                                            tests=[test],
+                                            recursive=True))
+
+    connections = tk.Text(connection_frame, width=TEXTBOX_WIDTH,
+                          height=TEXTBOX_HEIGHT / 2)
+    connections.grid(column=0, row=0, columnspan=3)
+
+    flow_data = FlowComponentData.analyze(test)
+    dependencies_tab = DependenciesTab(frame.master, flow_data)
+    dependencies_button = tk.Button(connection_frame, text="Dependencies",
+                                    command=dependencies_tab.show)
+    dependencies_button.grid(column=2, row=1, sticky=tk.W+tk.E)
+    # The flow's tab is destroyed when it's evicted from the tabs cache
+    frame.bind("<Destroy>", lambda event: dependencies_tab.destroy()
+               if event.widget is frame else None)
+
+    panes = (DescriptionPane(desc, partial(_describe_component, widget=desc)),
+             DescriptionPane(connections, FlowComponentData.get_description))
+
+    def show(_, sub_data):
+        for pane in panes:
+            pane.show(sub_data)
+
+    def on_hover(iid):
+        component = flow_tree.components.get(iid)
+        show(None, component)
+        DurationsManager.prefetch_hovered(
+                                    component.cls if component else None)
+
+    def on_shown(iids):
+        DurationsManager.prefetch_visible([flow_tree.components[iid].cls
+                                           for iid in iids
+                                           if iid in flow_tree.components])
+
+    flow_tree = FlowTree(list_frame, flow_data)
+    TreeHover(flow_tree.tree, on_hover)
+    VisibleRows(flow_tree.tree, on_shown)
+
+    show(None, flow_data)
+    DurationsManager.add_listener(desc, lambda _: panes[0].refresh())
+
+
+class FlowTree(object):
+    """Collapsible tree view of a flow's components.
+
+    Only the flow and its direct children are inserted at first, the rows of
+    a sub-flow's components are inserted when it's expanded for the first
+    time. Rows of components with errors (including errors of their
+    sub-components) are marked, so errors show on collapsed sub-flows too.
+
+    Attributes:
+        tree (ttk.Treeview): the tree view showing the components.
+        components (dict): item id -> FlowComponentData, of inserted rows.
+    """
+    def __init__(self, frame, flow_data):
+        self.tree = _create_tree(frame, [flow_data.name] +
+                                 [child.name for child in flow_data.children])
+        self.components = {}
+        self._placeholders = {}  # item id -> id of its placeholder child
+        self.tree.bind("<<TreeviewOpen>>", self._on_open)
+
+        iid = self._insert('', flow_data)
+        self._expand(iid)
+        self.tree.item(iid, open=True)
+
+    def _insert(self, parent, component):
+        """Insert a row for a component, without its sub-components.
+
+        Args:
+            parent (str): item id of the parent row ('' for the root).
+            component (FlowComponentData): component to insert.
+
+        Returns:
+            str. item id of the inserted row.
+        """
+        tags = (ERROR_TAG,) if component.errors else ()
+        iid = self.tree.insert(parent, tk.END, text=component.name, tags=tags)
+        self.components[iid] = component
+        if component.children:
+            # Makes the row expandable until the children are inserted
+            self._placeholders[iid] = self.tree.insert(iid, tk.END)
+
+        return iid
+
+    def _expand(self, iid):
+        """Replace the placeholder of a row with its components' rows."""
+        placeholder = self._placeholders.pop(iid, None)
+        if placeholder is None:
+            return
+
+        self.tree.delete(placeholder)
+        for child in self.components[iid].children:
+            self._insert(iid, child)
+
+    def _on_open(self, _):
+        """Insert the sub-components of the expanded row, if needed."""
+        self._expand(self.tree.focus())
+
+
+def _describe_component(component, widget):
+    """Return a description of the metadata of a flow component.
+
+    Args:
+        component (FlowComponentData): flow component to describe.
+        widget (tkinter.Widget): widget to schedule the durations refresh
+            with, if they are cached but stale.
+
+    Returns:
+        str. the component's description.
+    """
+    DurationsManager.load_cached(component.cls, widget)
+    return _get_cached_description(component, component.cls,
+                                   partial(_create_component_description,
+                                           component))
+
+
+def _create_component_description(component):
+    """Create the description of a component (see _describe_component)."""
+    test = component.cls
+    lines = [test.__name__ + "\n",
+             "Mode = {}\n".format(MODE_TO_STRING[component.mode])]
+    if hasattr(test, '_tklist_duration'):
+        lines.append("Duration: {}\n".format(test._tklist_duration))
+
+    lines.extend(_describe_roll_up(test))
+    lines.extend(_describe_resources(test))
+    lines.append("\n")
+    if test.__doc__:
+        lines.append(test.__doc__)
+
+    return "".join(lines)
+
+
+_class_to_explorer = {TestCase: _explore_case,
+                      TestFlow: _explore_flow}
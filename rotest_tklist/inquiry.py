@@ -0,0 +1,197 @@
+"""Result server statistics inquiries."""
+import queue
+import threading
+
+from rotest_tklist.profiling import TIMINGS
+
+
+DEFAULT_BATCH_SIZE = 50
+NO_HISTORY_ERROR = "No test history found!"
+
+
+class ServerConnectionError(Exception):
+    """Raised when a result client couldn't connect to the server."""
+
+
+class RequestError(Exception):
+    """Raised when a request failed without an answer from the server.
+
+    Unlike the server's answers (e.g. that a test has no history), such
+    errors are transient, so they shouldn't be cached.
+    """
+
+
+class ClientPool(object):
+    """Bounded pool of connected result clients.
+
+    Clients are created and connected lazily, up to the pool's size, and are
+    reused by the threads that fetch durations.
+
+    Attributes:
+        size (number): maximal number of clients.
+        factory (callable): creates a new, unconnected, client.
+    """
+    def __init__(self, size, factory):
+        self.size = size
+        self.factory = factory
+        self._idle = queue.Queue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self):
+        """Get an idle client, connecting a new one if there's none.
+
+        Returns:
+            ClientResultManager. a connected client.
+
+        Raises:
+            ServerConnectionError. if a new client couldn't connect.
+        """
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+
+        except queue.Empty:
+            pass
+
+        try:
+            client = self.factory()
+            client.connect()
+            return client
+
+        except Exception as error:
+            self._slots.release()
+            raise ServerConnectionError(error)
+
+    def release(self, client):
+        """Return a client to the pool."""
+        self._idle.put(client)
+        self._slots.release()
+
+
+class StatisticsInquirer(object):
+    """Batching layer between the durations manager and the result clients.
+
+    Names are deduplicated and split into batches, and each batch is sent as
+    a single bulk inquiry if the clients support it (by having a
+    'get_statistics_batch' method, which gets a list of names and returns a
+    dict of name -> statistics, omitting names without history). Otherwise,
+    or if the server rejects the bulk inquiry, the names of the batch are
+    inquired one by one using the same client.
+
+    Attributes:
+        BULK_METHOD (str): name of the clients' bulk inquiry method.
+        pool (ClientPool): pool of clients to inquiry with.
+        batch_size (number): maximal number of names in a batch.
+        bulk_supported (bool): whether bulk inquiries should be tried.
+        round_trips (number): number of requests sent to the server.
+    """
+    BULK_METHOD = 'get_statistics_batch'
+
+    def __init__(self, pool, batch_size=DEFAULT_BATCH_SIZE):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.bulk_supported = True
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def split(self, names):
+        """Split names into batches, removing repeating names.
+
+        The batches are kept small enough to give all the pool's clients
+        some of the work.
+
+        Args:
+            names (iterable): names of tests and components.
+
+        Returns:
+            list. lists of names, one for each batch.
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return []
+
+        per_client = -(-len(names) // self.pool.size)
+        size = max(1, min(self.batch_size, per_client))
+        return [names[index:index + size]
+                for index in range(0, len(names), size)]
+
+    def inquire(self, names, on_result, on_start=None, should_stop=None):
+        """Get the statistics of a batch of names (blocking).
+
+        Args:
+            names (list): names to inquiry.
+            on_result (callable): called with the name, the statistics and
+                the error for each name (either statistics or error is None).
+                The error is a RequestError if the request itself failed.
+            on_start (callable): called with the names a request is about to
+                be sent for.
+            should_stop (callable): returns whether to stop before sending
+                the next request.
+
+        Raises:
+            ServerConnectionError. if no client could connect to the server.
+        """
+        client = self.pool.acquire()
+        try:
+            if self.bulk_supported and hasattr(client, self.BULK_METHOD):
+                if self._inquire_bulk(client, names, on_result, on_start):
+                    return
+
+            for name in names:
+                if should_stop is not None and should_stop():
+                    return
+
+                if on_start is not None:
+                    on_start([name])
+
+                self._count_round_trip()
+                try:
+                    with TIMINGS.span("server requests"):
+                        statistics = client.get_statistics(name)
+
+                except RuntimeError as error:
+                    # The server answered with a failure
+                    on_result(name, None, error)
+
+                except Exception as error:
+                    on_result(name, None, RequestError(error))
+
+                else:
+                    on_result(name, statistics, None)
+
+        finally:
+            self.pool.release(client)
+
+    def _inquire_bulk(self, client, names, on_result, on_start):
+        """Try to get the statistics of the names in a single request.
+
+        Returns:
+            bool. whether the bulk inquiry succeeded.
+        """
+        if on_start is not None:
+            on_start(names)
+
+        self._count_round_trip()
+        try:
+            with TIMINGS.span("server requests"):
+                results = getattr(client, self.BULK_METHOD)(names)
+
+        except Exception:
+            self.bulk_supported = False
+            return False
+
+        for name in names:
+            if name in results:
+                on_result(name, results[name], None)
+
+            else:
+                on_result(name, None, RuntimeError(NO_HISTORY_ERROR))
+
+        return True
+
+    def _count_round_trip(self):
+        """Increase the count of requests sent to the server."""
+        with self._lock:
+            self.round_trips += 1
+
+        TIMINGS.count("server round trips")
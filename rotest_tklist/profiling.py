@@ -0,0 +1,154 @@
+"""Timing and counting of the explorer's phases."""
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+
+class Timings(object):
+    """Accumulated durations of the explorer's phases, and event counters.
+
+    Spans and counters may be recorded from any thread. A span of a phase
+    that is entered again in the same thread (e.g. by a recursive analysis)
+    is counted as part of the outer span, so time isn't counted twice. Spans
+    of different threads may overlap, so a phase's total time can exceed the
+    wall time.
+
+    Attributes:
+        started (number): time the timings were started or reset at.
+        spans (dict): phase name -> number of spans and total seconds.
+        counters (dict): event name -> count.
+    """
+    def __init__(self):
+        self.started = time.time()
+        self.spans = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._active = threading.local()
+        if hasattr(os, 'register_at_fork'):
+            # The lock may be held by another thread when forking
+            os.register_at_fork(after_in_child=self._reset_lock)
+
+    def _reset_lock(self):
+        """Replace the lock with a released one (in a forked child)."""
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name):
+        """Time the code in the context as part of a phase.
+
+        Args:
+            name (str): name of the phase.
+        """
+        active = getattr(self._active, 'names', None)
+        if active is None:
+            active = self._active.names = set()
+
+        if name in active:
+            yield
+            return
+
+        active.add(name)
+        start = time.perf_counter()
+        try:
+            yield
+
+        finally:
+            active.discard(name)
+            self.add_span(name, time.perf_counter() - start)
+
+    def add_span(self, name, duration):
+        """Add a measured span to a phase.
+
+        Args:
+            name (str): name of the phase.
+            duration (number): seconds the span took.
+        """
+        with self._lock:
+            count, total = self.spans.get(name, (0, 0.0))
+            self.spans[name] = (count + 1, total + duration)
+
+    def count(self, name, amount=1):
+        """Increase an event's counter.
+
+        Args:
+            name (str): name of the event.
+            amount (number): number of events to add.
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        """Forget all the recorded spans and counters."""
+        with self._lock:
+            self.started = time.time()
+            self.spans.clear()
+            self.counters.clear()
+
+    def to_dict(self):
+        """Return the recorded spans and counters.
+
+        Returns:
+            dict. the seconds since the timings were started, the spans
+                (phase name -> count and total seconds) and the counters.
+        """
+        with self._lock:
+            return {"elapsed": round(time.time() - self.started, 6),
+                    "spans": {name: {"count": count,
+                                     "total": round(total, 6)}
+                              for name, (count, total) in self.spans.items()},
+                    "counters": dict(self.counters)}
+
+    def format_status(self):
+        """Return a single line summary of the spans and counters."""
+        with self._lock:
+            parts = ["{}: {:.2f}s ({})".format(name, total, count)
+                     for name, (count, total) in self.spans.items()]
+            parts.extend("{}: {}".format(name, value)
+                         for name, value in self.counters.items())
+
+        return "   ".join(parts)
+
+    def dump(self, path):
+        """Write the spans and counters to a JSON file.
+
+        Args:
+            path (str): path of the file to write.
+        """
+        with open(path, 'w') as timings_file:
+            json.dump(self.to_dict(), timings_file, indent=4)
+
+
+TIMINGS = Timings()
+
+
+@contextmanager
+def profile(timings_path=None, profile_path=None):
+    """Record the timings and profile of the code in the context.
+
+    cProfile only profiles the thread that entered the context, the work of
+    the background threads shows in the timings.
+
+    Args:
+        timings_path (str): path to write the timings to as JSON on exit, or
+            None to not write them.
+        profile_path (str): path to write the cProfile stats to on exit, or
+            None to not profile.
+    """
+    profiler = None
+    if profile_path is not None:
+        import cProfile  # pylint: disable=import-outside-toplevel
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        yield TIMINGS
+
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+
+        if timings_path is not None:
+            TIMINGS.dump(timings_path)
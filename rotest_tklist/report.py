@@ -0,0 +1,168 @@
+"""Headless connectivity report of all the flows in a suite."""
+import sys
+import json
+import threading
+import multiprocessing
+
+from rotest.core import TestFlow
+
+from rotest_tklist.profiling import TIMINGS
+from rotest_tklist.analysis import FlowComponentData
+
+
+_WORKER_FLOWS = []
+
+
+def analyze_flow(flow_class):
+    """Analyze the connectivity of a flow.
+
+    Args:
+        flow_class (type): flow class to analyze.
+
+    Returns:
+        dict. summary of the flow's analysis, containing the flow's name and
+            module, its unconnected inputs, and its errors, each error
+            with the path of the component it was found in.
+    """
+    summary = {"flow": flow_class.__name__,
+               "module": flow_class.__module__,
+               "unconnected_inputs": [],
+               "errors": []}
+    try:
+        flow_data = FlowComponentData.analyze(flow_class)
+
+    except Exception as error:
+        summary["errors"].append({"component": flow_class.__name__,
+                                  "error": "Analysis failed: {}".format(
+                                                                    error)})
+        return summary
+
+    summary["unconnected_inputs"] = list(flow_data.unconnected_inputs)
+    for component, path in _iterate_paths(flow_data):
+        for error in dict.fromkeys(component.own_errors):
+            summary["errors"].append({"component": path, "error": error})
+
+    return summary
+
+
+def _iterate_paths(component, prefix=""):
+    """Yield the components under a flow data, with their full paths."""
+    path = prefix + component.name
+    yield component, path
+    for child in component.children:
+        for sub_component, sub_path in _iterate_paths(child, path + "."):
+            yield sub_component, sub_path
+
+
+def _init_worker(flows):
+    """Keep the flows to analyze in a worker process."""
+    _WORKER_FLOWS[:] = flows
+
+
+def _analyze_flow_at(index):
+    """Analyze the flow of the given index (worker process)."""
+    return analyze_flow(_WORKER_FLOWS[index])
+
+
+def _can_fork():
+    """Return whether worker processes can be forked safely."""
+    return sys.platform.startswith('linux') and \
+        threading.active_count() == 1
+
+
+def iterate_analyses(flows, processes=None):
+    """Analyze the connectivity of flows, using multiple processes.
+
+    The flows are passed to the worker processes by forking, since flows
+    that were created by parametrizing can't be pickled. Forking is safe
+    only on Linux, and only while no other threads run (they may hold locks
+    the forked workers would wait for), so otherwise the flows are analyzed
+    in the current process. Each worker keeps its analyses cache, so
+    sub-flows shared by the flows it got are analyzed once.
+
+    Args:
+        flows (list): flow classes to analyze.
+        processes (number): number of worker processes, None to use all the
+            CPUs, 1 to analyze in the current process.
+
+    Yields:
+        dict. the analysis summary of each flow (see analyze_flow), in the
+            flows' order, as soon as it's ready.
+    """
+    if processes == 1 or len(flows) < 2 or not _can_fork():
+        for flow in flows:
+            yield analyze_flow(flow)
+
+        return
+
+    context = multiprocessing.get_context('fork')
+    pool = context.Pool(processes, _init_worker, (flows,))
+    try:
+        chunk_size = max(1, len(flows) // (4 * (processes or
+                                                multiprocessing.cpu_count())))
+        for summary in pool.imap(_analyze_flow_at, range(len(flows)),
+                                 chunk_size):
+            yield summary
+
+    finally:
+        pool.close()
+        pool.join()
+
+
+def analyze_flows(flows, processes=None):
+    """Analyze the connectivity of flows, see iterate_analyses.
+
+    Returns:
+        list. the analysis summary of each flow (see analyze_flow).
+    """
+    return list(iterate_analyses(flows, processes))
+
+
+def format_report(summaries, output_format):
+    """Return the report of the flows analysis as a string.
+
+    Args:
+        summaries (list): the analysis summaries of the flows.
+        output_format (str): 'text' or 'json'.
+
+    Returns:
+        str. formatted report.
+    """
+    failed = [summary for summary in summaries if summary["errors"]]
+    if output_format == 'json':
+        return json.dumps({"flows": summaries,
+                           "total": len(summaries),
+                           "failed": len(failed)}, indent=4)
+
+    lines = []
+    for summary in failed:
+        lines.append("{} ({}): {} errors".format(summary["flow"],
+                                                 summary["module"],
+                                                 len(summary["errors"])))
+        for error in summary["errors"]:
+            lines.append("    {}: {}".format(error["component"],
+                                             error["error"]))
+
+    lines.append("{} flows analyzed, {} with errors".format(len(summaries),
+                                                            len(failed)))
+    return "\n".join(lines)
+
+
+def report_flows(tests, output_format='text', processes=None,
+                 stream=sys.stdout):
+    """Analyze all the flows among the tests and write a report.
+
+    Args:
+        tests (list): test classes, only the flows among them are analyzed.
+        output_format (str): 'text' or 'json'.
+        processes (number): number of worker processes to analyze with.
+        stream (file): stream to write the report to.
+
+    Returns:
+        number. exit code, 1 if errors were found and 0 otherwise.
+    """
+    flows = [test for test in tests if issubclass(test, TestFlow)]
+    with TIMINGS.span("analysis"):
+        summaries = analyze_flows(flows, processes)
+    stream.write(format_report(summaries, output_format) + "\n")
+    return 1 if any(summary["errors"] for summary in summaries) else 0
@@ -0,0 +1,180 @@
+"""Index of the resources requested by the tests of a suite."""
+import sys
+import json
+
+from rotest.core import TestFlow
+
+
+_REQUESTS = {}
+
+
+def get_requests(component_class):
+    """Return the resource requests of a test or component class.
+
+    Collecting the requests requires scanning the class's fields, so they
+    are collected once per class.
+
+    Args:
+        component_class (type): test, block or flow class.
+
+    Returns:
+        list. the class's resource requests.
+    """
+    if component_class not in _REQUESTS:
+        _REQUESTS[component_class] = list(
+                                component_class.get_resource_requests())
+
+    return _REQUESTS[component_class]
+
+
+def forget_requests(component_classes):
+    """Remove the collected requests of classes that were replaced.
+
+    Args:
+        component_classes (iterable): classes that were replaced, e.g. by
+            reloading their modules.
+    """
+    for component_class in component_classes:
+        _REQUESTS.pop(component_class, None)
+
+
+def get_test_requests(test):
+    """Return the resource requests of a test, including nested blocks'.
+
+    Flow components share the resources of the same name, so each name is
+    counted once.
+
+    Args:
+        test (type): test class.
+
+    Returns:
+        list. the resource requests, one for each resource name.
+    """
+    requests = {}
+    pending = [test]
+    visited = set()
+    while pending:
+        component = pending.pop(0)
+        if component in visited:
+            continue
+
+        visited.add(component)
+        for request in get_requests(component):
+            requests.setdefault(request.name, request)
+
+        if issubclass(component, TestFlow):
+            pending.extend(component.blocks)
+
+    return list(requests.values())
+
+
+def _format_kwargs(kwargs):
+    """Return a display string of a request's kwargs, in a stable order."""
+    return "({})".format(", ".join("{}={!r}".format(name, kwargs[name])
+                                   for name in sorted(kwargs)))
+
+
+class ResourceDemand(object):
+    """Demand of the tests of a suite for a resource type.
+
+    Attributes:
+        type_name (str): name of the resource type.
+        cases (list): test cases requesting the type.
+        flows (list): flows requesting the type (including by blocks).
+        variants (dict): the requests' kwargs display string -> the tests
+            requesting the type with these kwargs.
+    """
+    def __init__(self, type_name):
+        self.type_name = type_name
+        self.cases = []
+        self.flows = []
+        self.variants = {}
+
+    @property
+    def requests(self):
+        """Number of requests for the type, over all the tests."""
+        return sum(len(tests) for tests in self.variants.values())
+
+    def add(self, test, request):
+        """Register a test's request for the type."""
+        tests = self.flows if issubclass(test, TestFlow) else self.cases
+        if test not in tests[-1:]:
+            tests.append(test)
+
+        self.variants.setdefault(_format_kwargs(request.kwargs),
+                                 []).append(test)
+
+    def to_dict(self):
+        """Return the demand as JSON serializable data."""
+        return {"type": self.type_name,
+                "cases": len(self.cases),
+                "flows": len(self.flows),
+                "requests": self.requests,
+                "variants": [{"kwargs": kwargs,
+                              "tests": [test.__name__ for test in tests]}
+                             for kwargs, tests in self.variants.items()]}
+
+
+class ResourceIndex(object):
+    """Aggregated demand for resource types, over all the tests of a suite.
+
+    Attributes:
+        tests (list): the indexed test classes.
+        demands (dict): resource type name -> its ResourceDemand, sorted by
+            the number of requests, descending.
+    """
+    def __init__(self, tests):
+        self.tests = list(tests)
+        demands = {}
+        for test in self.tests:
+            for request in get_test_requests(test):
+                type_name = request.type.__name__
+                if type_name not in demands:
+                    demands[type_name] = ResourceDemand(type_name)
+
+                demands[type_name].add(test, request)
+
+        self.demands = {type_name: demands[type_name]
+                        for type_name in sorted(
+                            demands, key=lambda name: -demands[name].requests)}
+
+    def format(self, output_format):
+        """Return the demand for the resource types as a string.
+
+        Args:
+            output_format (str): 'text' or 'json'.
+
+        Returns:
+            str. formatted demand.
+        """
+        if output_format == 'json':
+            return json.dumps({"resources": [demand.to_dict() for demand in
+                                             self.demands.values()],
+                               "tests": len(self.tests)}, indent=4)
+
+        lines = []
+        for demand in self.demands.values():
+            lines.append("{}: {} cases, {} flows, {} requests".format(
+                                demand.type_name, len(demand.cases),
+                                len(demand.flows), demand.requests))
+            for kwargs, tests in demand.variants.items():
+                lines.append("    {}: {} tests".format(kwargs, len(tests)))
+
+        lines.append("{} resource types requested by {} tests".format(
+                                        len(self.demands), len(self.tests)))
+        return "\n".join(lines)
+
+
+def report_resources(tests, output_format='text', stream=sys.stdout):
+    """Write the demand of the tests for resource types.
+
+    Args:
+        tests (list): test classes.
+        output_format (str): 'text' or 'json'.
+        stream (file): stream to write the report to.
+
+    Returns:
+        number. exit code.
+    """
+    stream.write(ResourceIndex(tests).format(output_format) + "\n")
+    return 0
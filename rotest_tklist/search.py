@@ -0,0 +1,286 @@
+"""Search index of tests by name, tags, resources and state."""
+import re
+import bisect
+import fnmatch
+
+from rotest_tklist.resources import get_test_requests
+
+
+FIELDS = ('name', 'tag', 'res')
+STATES = ('error', 'timed')
+OPERATORS = ('and', 'or', 'not', '(', ')')
+
+_GLOB_CHARACTERS = re.compile(r'[*?\[]')
+
+
+class TestsIndex(object):
+    """Inverted index of tests, to filter them by a search query.
+
+    A query is composed of terms, which may be combined by the boolean
+    operators "and", "or", "not" and parentheses, like rotest's tags filter.
+    Adjacent terms without an operator between them must all match.
+
+    Terms are matched case insensitively against the tests' names, tags and
+    requested resources' types, and may be limited to one of those using the
+    "name:", "tag:" and "res:" prefixes. A term without wildcards matches
+    any value containing it, and a term with wildcards (e.g. "Tag*") is
+    matched against whole values using fnmatch. The "is:error" and
+    "is:timed" terms match the tests with validation or flow connectivity
+    errors and the tests whose durations were fetched.
+
+    Collecting the tests' resource requests is relatively slow, so the
+    resources aren't indexed on creation. They can be collected in the
+    background using get_resource_types, and then indexed by add_resources.
+
+    Attributes:
+        tests (list): the indexed test classes.
+    """
+    def __init__(self, tests):
+        self.tests = list(tests)
+        self._order = {test: index for index, test in enumerate(self.tests)}
+        self._values = {field: {} for field in FIELDS}  # value -> tests
+        self._states = {state: set() for state in STATES}
+        self._matches = {}  # (field, term) -> matching tests
+
+        for test in self.tests:
+            self._add(test, 'name', [test.__name__])
+            self._add(test, 'tag', test.TAGS)
+            self.update(test)
+
+        self._sorted_values = {field: sorted(values)
+                               for field, values in self._values.items()}
+
+    def _add(self, test, field, values):
+        """Index the values of a test's field."""
+        for value in values:
+            self._values[field].setdefault(value.lower(), set()).add(test)
+
+    def add_resources(self, resource_types):
+        """Index the types of the resources the tests request.
+
+        Args:
+            resource_types (dict): test class -> names of the types of the
+                resources it requests, see get_resource_types.
+        """
+        for test, values in resource_types.items():
+            self._add(test, 'res', values)
+
+        self._sorted_values['res'] = sorted(self._values['res'])
+        self._matches = {key: tests for key, tests in self._matches.items()
+                         if key[0] != 'res'}
+
+    def replace(self, test, new_test, resource_types=()):
+        """Index a new class of a test instead of its old one.
+
+        Args:
+            test (type): the indexed test class.
+            new_test (type): the class replacing it, e.g. after reloading.
+            resource_types (list): names of the types of the resources the
+                new class requests.
+        """
+        for values in self._values.values():
+            for tests in values.values():
+                tests.discard(test)
+
+        for tests in self._states.values():
+            tests.discard(test)
+
+        index = self._order.pop(test)
+        self.tests[index] = new_test
+        self._order[new_test] = index
+        self._add(new_test, 'name', [new_test.__name__])
+        self._add(new_test, 'tag', new_test.TAGS)
+        self._add(new_test, 'res', resource_types)
+        self.update(new_test)
+        self._sorted_values = {field: sorted(values)
+                               for field, values in self._values.items()}
+        self._matches = {}
+
+    def update(self, test):
+        """Index the current state of a test.
+
+        Should be called when the validation error, connectivity errors or
+        duration of the test are found. The names, tags and resources of the
+        tests don't change, so only the state is indexed again.
+
+        Args:
+            test (type): test class to index.
+        """
+        for state, attributes in (('error', ('_tklist_error',
+                                             '_tklist_flow_errors')),
+                                  ('timed', ('_tklist_duration',))):
+            if any(hasattr(test, attribute) for attribute in attributes):
+                self._states[state].add(test)
+
+            else:
+                self._states[state].discard(test)
+
+    def search(self, query):
+        """Return the tests that match a query.
+
+        Args:
+            query (str): the query, see the class's documentation.
+
+        Returns:
+            list. the matching tests, in their original order.
+
+        Raises:
+            ValueError: the query isn't a valid expression.
+        """
+        tokens = query.replace("(", " ( ").replace(")", " ) ").split()
+        if not tokens:
+            return list(self.tests)
+
+        parser = _QueryParser(tokens, self._match_term, set(self.tests))
+        return sorted(parser.parse(), key=self._order.get)
+
+    def _match_term(self, term):
+        """Return the set of tests that match a single term."""
+        field, _, pattern = term.lower().rpartition(':')
+        if field == 'is':
+            if pattern not in self._states:
+                raise ValueError("Unknown state %r, expected one of %s" %
+                                 (pattern, ", ".join(STATES)))
+
+            return self._states[pattern]
+
+        if field and field not in FIELDS:
+            raise ValueError("Unknown field %r, expected one of %s" %
+                             (field, ", ".join(FIELDS + ('is',))))
+
+        matched = set()
+        for searched_field in (field,) if field else FIELDS:
+            matched.update(self._match_field(searched_field, pattern))
+
+        return matched
+
+    def _match_field(self, field, pattern):
+        """Return the set of tests whose field's values match a pattern."""
+        key = (field, pattern)
+        if key not in self._matches:
+            values = self._values[field]
+            if not _GLOB_CHARACTERS.search(pattern):
+                keys = [value for value in values if pattern in value]
+
+            elif (pattern.endswith('*') and
+                  not _GLOB_CHARACTERS.search(pattern[:-1])):
+                keys = self._prefixed(field, pattern[:-1])
+
+            else:
+                keys = fnmatch.filter(values, pattern)
+
+            self._matches[key] = set().union(*(values[value]
+                                               for value in keys))
+
+        return self._matches[key]
+
+    def _prefixed(self, field, prefix):
+        """Return the values of a field that start with a prefix."""
+        sorted_values = self._sorted_values[field]
+        start = bisect.bisect_left(sorted_values, prefix)
+        end = start
+        while end < len(sorted_values) and \
+                sorted_values[end].startswith(prefix):
+            end += 1
+
+        return sorted_values[start:end]
+
+
+def get_resource_types(tests):
+    """Return the types of the resources that tests request.
+
+    The resources requested by the blocks of flows are included.
+
+    Args:
+        tests (list): test classes.
+
+    Returns:
+        dict. test class -> list of the names of its resources' types.
+    """
+    return {test: [request.type.__name__
+                   for request in get_test_requests(test)]
+            for test in tests}
+
+
+class _QueryParser(object):
+    """Evaluate a tokenized query into the set of matching tests.
+
+    Attributes:
+        tokens (list): the query's tokens.
+        match_term (callable): returns the set of tests matching a term.
+        universe (set): all the tests, used to evaluate "not".
+    """
+    def __init__(self, tokens, match_term, universe):
+        self.tokens = tokens
+        self.match_term = match_term
+        self.universe = universe
+        self._position = 0
+
+    def parse(self):
+        """Evaluate the whole query.
+
+        Returns:
+            set. the matching tests.
+
+        Raises:
+            ValueError: the query isn't a valid expression.
+        """
+        result = self._parse_or()
+        if self._peek() is not None:
+            raise ValueError("Unexpected %r" % self._peek())
+
+        return result
+
+    def _peek(self):
+        """Return the next token, or None at the end of the query."""
+        if self._position < len(self.tokens):
+            return self.tokens[self._position]
+
+        return None
+
+    def _next(self):
+        """Consume and return the next token."""
+        token = self._peek()
+        if token is None:
+            raise ValueError("Unexpected end of query")
+
+        self._position += 1
+        return token
+
+    def _parse_or(self):
+        """Evaluate terms joined by "or"."""
+        result = self._parse_and()
+        while self._peek() == 'or':
+            self._next()
+            result = result | self._parse_and()
+
+        return result
+
+    def _parse_and(self):
+        """Evaluate terms joined by "and" or by nothing."""
+        result = self._parse_not()
+        while self._peek() not in (None, 'or', ')'):
+            if self._peek() == 'and':
+                self._next()
+
+            result = result & self._parse_not()
+
+        return result
+
+    def _parse_not(self):
+        """Evaluate a term, a negated term or a parenthesized query."""
+        token = self._next()
+        if token == 'not':
+            return self.universe - self._parse_not()
+
+        if token == '(':
+            result = self._parse_or()
+            if self._next() != ')':
+                raise ValueError("Unbalanced parentheses")
+
+            return result
+
+        if token in OPERATORS:
+            raise ValueError("Unexpected %r" % token)
+
+        return self.match_term(token)
@@ -0,0 +1,182 @@
+"""Persistent snapshot of the tests' analyses, for fast relaunches."""
+import os
+import sys
+import json
+import sqlite3
+import threading
+
+from rotest_tklist.cache import get_cache_dir, open_database
+from rotest_tklist.profiling import TIMINGS
+from rotest_tklist.watch import get_source_modules
+
+
+SNAPSHOT_VERSION = 2
+
+
+def _get_key(test):
+    """Return the name a test is kept under in the snapshot."""
+    return "{}.{}".format(test.__module__, test.__name__)
+
+
+class AnalysisSnapshot(object):
+    """Results of the tests' analyses, persisted in an sqlite database.
+
+    Each test's results are kept along with a fingerprint of the modules it
+    comes from (including the modules of its components), made of their
+    files' modification times and sizes. Results are only loaded if the
+    fingerprint didn't change, so only the tests of changed modules are
+    analyzed again.
+
+    Results are kept per field (see FIELDS), so each field can be computed
+    and stored separately. Updates are kept in memory until flushed.
+
+    Attributes:
+        ENABLED (bool): whether the explorer should use a persistent
+            snapshot (instead of an in memory one).
+        FIELDS (tuple): names of the kept results: the validation error
+            (None if the test is valid), the flow's analysis summary (see
+            analyze_flow) and the names of the requested resources' types.
+        path (str): path of the database file, or ':memory:'.
+    """
+    ENABLED = True
+    FIELDS = ('validation', 'flow_analysis', 'resource_types')
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(get_cache_dir(), 'snapshot.sqlite')
+
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (fingerprint, dict of field -> result)
+        self._fingerprints = {}  # test class -> fingerprint
+        self._dirty = set()
+        self._connection = self._connect()
+
+    def _connect(self):
+        """Open the database and load its entries, or work in memory only.
+
+        Returns:
+            sqlite3.Connection. connection to the database, or None if it
+                couldn't be opened.
+        """
+        connection, rows = open_database(
+                            self.path,
+                            "CREATE TABLE IF NOT EXISTS snapshot ("
+                            "test TEXT PRIMARY KEY, fingerprint TEXT, "
+                            "results TEXT)",
+                            "SELECT test, fingerprint, results FROM snapshot")
+        for key, fingerprint, results in rows:
+            self._entries[key] = (fingerprint, json.loads(results))
+
+        return connection
+
+    def load(self, tests):
+        """Return the kept results of tests whose modules didn't change.
+
+        Args:
+            tests (list): test classes to get the results of.
+
+        Returns:
+            dict. test class -> dict of field -> result, of the fields that
+                are kept. Tests without kept results are omitted.
+        """
+        file_stats = {}
+        loaded = {}
+        for test in tests:
+            fingerprint = self._fingerprint(test, file_stats)
+            self._fingerprints[test] = fingerprint
+            entry = self._entries.get(_get_key(test))
+            if fingerprint is not None and entry is not None and \
+                    entry[0] == fingerprint:
+                TIMINGS.count("snapshot hits")
+                loaded[test] = dict(entry[1])
+
+            else:
+                TIMINGS.count("snapshot misses")
+
+        return loaded
+
+    @staticmethod
+    def _fingerprint(test, file_stats):
+        """Return the fingerprint of the modules a test comes from.
+
+        Args:
+            test (type): test class.
+            file_stats (dict): module name -> its file's stats, memoized
+                between the calls of a single load.
+
+        Returns:
+            str. the fingerprint, or None if the test's modules files can't
+                be found, so changes in them can't be detected.
+        """
+        modules = sorted(get_source_modules(test))
+        stats = [SNAPSHOT_VERSION]
+        for name in modules:
+            if name not in file_stats:
+                path = getattr(sys.modules.get(name), '__file__', None)
+                try:
+                    status = os.stat(path)
+                    file_stats[name] = (status.st_mtime, status.st_size)
+
+                except (OSError, TypeError):
+                    file_stats[name] = None
+
+            if file_stats[name] is None:
+                return None
+
+            stats.append((name, file_stats[name]))
+
+        if not modules:
+            return None
+
+        return json.dumps(stats)
+
+    def update(self, test, field, result):
+        """Keep a result of a test, until the next flush.
+
+        Args:
+            test (type): test class.
+            field (str): one of FIELDS.
+            result (object): JSON serializable result.
+        """
+        if test not in self._fingerprints:
+            self._fingerprints[test] = self._fingerprint(test, {})
+
+        fingerprint = self._fingerprints[test]
+        if fingerprint is None:
+            return
+
+        key = _get_key(test)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != fingerprint:
+            entry = self._entries[key] = (fingerprint, {})
+
+        entry[1][field] = result
+        self._dirty.add(key)
+
+    def flush(self):
+        """Write the updated results to the database."""
+        if not self._dirty or self._connection is None:
+            self._dirty.clear()
+            return
+
+        rows = [(key, self._entries[key][0], json.dumps(self._entries[key][1]))
+                for key in self._dirty]
+        self._dirty.clear()
+        with self._lock:
+            try:
+                with self._connection:
+                    self._connection.executemany(
+                                "INSERT OR REPLACE INTO snapshot "
+                                "VALUES (?, ?, ?)", rows)
+
+            except sqlite3.Error:
+                pass
+
+    def clear(self):
+        """Remove all the kept results."""
+        self._entries.clear()
+        self._dirty.clear()
+        if self._connection is not None:
+            with self._lock, self._connection:
+                self._connection.execute("DELETE FROM snapshot")
@@ -0,0 +1,252 @@
+"""Reloading of tests modules that changed on disk."""
+import os
+import sys
+import sysconfig
+import importlib
+from collections import namedtuple
+
+from rotest.core import TestCase, TestFlow, TestBlock
+
+
+ReloadResult = namedtuple('ReloadResult', ['replaced', 'errors', 'affected'])
+
+# Directories of the standard library and the installed packages
+LIBRARY_PATHS = tuple(set(
+            os.path.join(os.path.normcase(os.path.realpath(path)), '')
+            for name, path in sysconfig.get_paths().items()
+            if name in ('stdlib', 'platstdlib', 'purelib', 'platlib')))
+
+_WATCHABLE = {}
+
+
+def _is_watchable(module_name):
+    """Return whether a module may contain the user's tests.
+
+    Rotest's modules, and modules of the standard library or of installed
+    packages (or without a file) aren't, so they aren't tracked.
+    """
+    if module_name not in _WATCHABLE:
+        path = getattr(sys.modules.get(module_name), '__file__', None)
+        _WATCHABLE[module_name] = path is not None and \
+            module_name != '__main__' and \
+            module_name.split('.')[0] not in ('rotest', 'rotest_tklist') and \
+            not os.path.normcase(os.path.realpath(path)).startswith(
+                                                                LIBRARY_PATHS)
+
+    return _WATCHABLE[module_name]
+
+
+def get_source_modules(test):
+    """Return the names of the modules a test and its components come from.
+
+    Args:
+        test (type): test class.
+
+    Returns:
+        set. names of the modules (excluding rotest's own).
+    """
+    modules = set()
+    visited = set()
+    pending = [test]
+    while pending:
+        component = pending.pop()
+        if component in visited:
+            continue
+
+        visited.add(component)
+        modules.update(base.__module__ for base in component.__mro__
+                       if _is_watchable(base.__module__))
+        if issubclass(component, TestFlow):
+            pending.extend(component.blocks)
+
+    return modules
+
+
+class DependencyIndex(object):
+    """Reverse index of the components of tests.
+
+    Maps each component class (a test, block or sub-flow) to the flows that
+    contain it, and each module to the components that are defined in it or
+    inherit from a class defined in it (parametrized blocks are subclasses
+    created by rotest, so their own module isn't the one to watch).
+
+    Attributes:
+        tests (list): the indexed test classes.
+    """
+    def __init__(self, tests):
+        self.tests = list(tests)
+        self._parents = {}  # component class -> flows containing it
+        self._modules = {}  # module name -> component classes
+        self._seen = set()
+        for test in self.tests:
+            self._add(test)
+
+    def _add(self, component):
+        """Index a component and its sub-components."""
+        if component in self._seen:
+            return
+
+        self._seen.add(component)
+        for base in component.__mro__:
+            self._modules.setdefault(base.__module__, set()).add(component)
+
+        if issubclass(component, TestFlow):
+            for block in component.blocks:
+                self._parents.setdefault(block, set()).add(component)
+                self._add(block)
+
+    def get_modules(self):
+        """Return the names of the modules the components come from."""
+        return [name for name in self._modules if _is_watchable(name)]
+
+    def get_affected(self, module_names):
+        """Return the components affected by changes in modules.
+
+        Args:
+            module_names (list): names of the changed modules.
+
+        Returns:
+            list. the components of the modules and the flows containing
+                them (recursively), each after its sub-components.
+        """
+        order = []
+        visited = set()
+
+        def visit(component):
+            if component in visited:
+                return
+
+            visited.add(component)
+            for parent in self._parents.get(component, ()):
+                visit(parent)
+
+            order.append(component)
+
+        for name in module_names:
+            for component in self._modules.get(name, ()):
+                visit(component)
+
+        order.reverse()
+        return order
+
+
+def _get_source_module(component):
+    """Return the name of the watchable module a component comes from."""
+    for base in component.__mro__:
+        if _is_watchable(base.__module__):
+            return base.__module__
+
+    return None
+
+
+class ModulesWatcher(object):
+    """Detect changes in the files of tests modules, and reload them.
+
+    The files' modification times are compared on each check, so no
+    platform specific notifications are needed.
+
+    Attributes:
+        tests (list): the current test classes, updated on reloads.
+        index (DependencyIndex): reverse index of the tests' components.
+    """
+    def __init__(self, tests):
+        self.tests = list(tests)
+        self.index = DependencyIndex(self.tests)
+        self._mtimes = {}  # module name -> (file path, modification time)
+        self._track()
+
+    def _track(self):
+        """Record the modification times of the indexed modules' files."""
+        mtimes = {}
+        for name in self.index.get_modules():
+            path = getattr(sys.modules.get(name), '__file__', None)
+            if path is None:
+                continue
+
+            if path.endswith('.pyc'):
+                path = path[:-1]
+
+            previous = self._mtimes.get(name)
+            if previous is not None and previous[0] == path:
+                mtimes[name] = previous
+
+            else:
+                mtimes[name] = (path, self._get_mtime(path))
+
+        self._mtimes = mtimes
+
+    @staticmethod
+    def _get_mtime(path):
+        """Return the modification time of a file, or None if it's gone."""
+        try:
+            return os.stat(path).st_mtime
+
+        except OSError:
+            return None
+
+    def get_changed(self):
+        """Return the names of the modules whose files changed."""
+        changed = []
+        for name, (path, mtime) in self._mtimes.items():
+            current = self._get_mtime(path)
+            if current != mtime:
+                self._mtimes[name] = (path, current)
+                changed.append(name)
+
+        return changed
+
+    def reload(self, module_names):
+        """Reload changed modules and the modules of the affected tests.
+
+        The modules of flows that contain affected components are reloaded
+        too (after the modules of their components), so they refer to the
+        new classes.
+
+        Args:
+            module_names (list): names of the changed modules.
+
+        Returns:
+            ReloadResult. dict of replaced test class -> its new class, dict
+                of test class -> error for tests that couldn't be reloaded,
+                and the list of the affected (old) component classes.
+        """
+        affected = self.index.get_affected(module_names)
+        modules = list(module_names)
+        for component in affected:
+            name = _get_source_module(component)
+            if name is not None and name not in modules:
+                modules.append(name)
+
+        failures = {}
+        for name in modules:
+            try:
+                importlib.reload(sys.modules[name])
+
+            except Exception as error:  # pylint: disable=broad-except
+                failures[name] = "Reloading {} failed: {}".format(name, error)
+
+        replaced = {}
+        errors = {}
+        affected_set = set(affected)
+        for index, test in enumerate(self.tests):
+            if test not in affected_set:
+                continue
+
+            if test.__module__ in failures:
+                errors[test] = failures[test.__module__]
+                continue
+
+            new_test = getattr(sys.modules[test.__module__], test.__name__,
+                               None)
+            if not isinstance(new_test, type) or \
+                    not issubclass(new_test, (TestCase, TestFlow, TestBlock)):
+                errors[test] = "{} wasn't found in {} after reloading".format(
+                                                test.__name__, test.__module__)
+                continue
+
+            replaced[test] = new_test
+            self.tests[index] = new_test
+
+        self.index = DependencyIndex(self.tests)
+        self._track()
+        return ReloadResult(replaced, errors, affected)
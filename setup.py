@@ -17,6 +17,7 @@ setup(
         "dev": [
             "flake8",
             "pylint",
+            "pytest",
         ]
     },
     python_requires=">=2.7,!=3.0.*,!=3.1.*,!=3.2.*,!=3.3.*,!=3.4.*",
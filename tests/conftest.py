@@ -0,0 +1,44 @@
+"""Shared fixtures of the tests."""
+import time
+
+import pytest
+
+
+class SchedulingWidget(object):
+    """Widget running its scheduled callbacks in place of the Tk loop.
+
+    Attributes:
+        exists (bool): whether the widget wasn't destroyed.
+    """
+    def __init__(self):
+        self.exists = True
+        self._scheduled = []
+
+    def winfo_exists(self):
+        """Return whether the widget exists."""
+        return self.exists
+
+    def after(self, milliseconds, callback):
+        """Schedule a callback."""
+        self._scheduled.append((time.time() + milliseconds / 1000.0,
+                                callback))
+
+    def run(self, limit=3):
+        """Call the scheduled callbacks, until none is left or time is up.
+
+        Returns:
+            bool. whether all the scheduled callbacks were called.
+        """
+        end = time.time() + limit
+        while self._scheduled and time.time() < end:
+            due, callback = self._scheduled.pop(0)
+            time.sleep(max(due - time.time(), 0))
+            callback()
+
+        return not self._scheduled
+
+
+@pytest.fixture(name='widget')
+def widget_fixture():
+    """Return a widget running its scheduled callbacks on demand."""
+    return SchedulingWidget()
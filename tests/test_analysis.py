@@ -0,0 +1,140 @@
+"""Tests of the flows connectivity analysis."""
+import pytest
+from rotest import core
+
+from rotest_tklist.analysis import FlowComponentData, ReadOnlyDict
+
+
+class Producer(core.TestBlock):
+    """Block with an output."""
+    __test__ = False
+
+    result = core.BlockOutput()
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class Consumer(core.TestBlock):
+    """Block with an input, and an optional one."""
+    __test__ = False
+
+    source = core.BlockInput()
+    level = core.BlockInput(default=1)
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class InnerFlow(core.TestFlow):
+    """Flow leaving its consumer's source unconnected."""
+    __test__ = False
+
+    blocks = (Consumer,)
+
+
+class PipedFlow(core.TestFlow):
+    """Flow connecting the output to the input by a Pipe."""
+    __test__ = False
+
+    blocks = (Producer.params(result=core.Pipe('source')), InnerFlow,
+              Consumer.params(level=core.Pipe('depth')))
+
+
+@pytest.fixture(name='analysis')
+def analysis_fixture():
+    """Return the analysis of the piped flow, analyzing it again."""
+    FlowComponentData.forget([PipedFlow, InnerFlow, Consumer])
+    return FlowComponentData.analyze(PipedFlow)
+
+
+def test_connections(analysis):
+    """Outputs, Pipes and parameters connect the inputs."""
+    producer, inner_flow, piped_consumer = analysis.children
+    first_consumer = inner_flow.children[0]
+    assert producer.outputs == {'result': 'source'}
+    assert producer.actual_outputs == {'source': [first_consumer,
+                                                  piped_consumer]}
+    assert first_consumer.actual_inputs == {'source': producer,
+                                            'level': '(default value = 1)'}
+    assert piped_consumer.inputs == {'source': 'source', 'level': 'depth'}
+    assert piped_consumer.actual_inputs == {'source': producer, 'depth': ''}
+    assert analysis.unconnected_inputs == ('Consumer.depth',)
+
+
+def test_interface_is_shared_until_changed(analysis):
+    """Components share their class's data, and copy it to change it."""
+    shadow_consumer = FlowComponentData.analyze(InnerFlow).children[0]
+    first_consumer = analysis.children[1].children[0]
+    _, inputs, providers, _, _, _ = FlowComponentData.get_interface(Consumer)
+
+    assert shadow_consumer.actual_inputs is providers
+    assert shadow_consumer.inputs is inputs
+    assert not shadow_consumer.actual_outputs
+    assert first_consumer.inputs is inputs
+    assert first_consumer.actual_inputs is not providers
+    assert providers == {'source': '', 'level': '(default value = 1)'}
+    with pytest.raises(TypeError):
+        providers['source'] = 'value'
+
+    assert isinstance(first_consumer.actual_inputs, dict)
+    assert not isinstance(first_consumer.actual_inputs, ReadOnlyDict)
+
+
+def test_errors(analysis):
+    """Unconnected inputs are errors of their component and its parents."""
+    producer, inner_flow, piped_consumer = analysis.children
+    error = "Input 'depth' is not connected!"
+    assert piped_consumer.own_errors == (error,)
+    assert analysis.errors == (error,)
+    assert analysis.own_errors == ()
+    assert producer.errors == inner_flow.errors == ()
+
+
+class DoubleProducer(core.TestBlock):
+    """Block with two outputs."""
+    __test__ = False
+
+    first = core.BlockOutput()
+    second = core.BlockOutput()
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class SameNameFlow(core.TestFlow):
+    """Flow piping both outputs to the same name."""
+    __test__ = False
+
+    blocks = (DoubleProducer.params(first=core.Pipe('source'),
+                                    second=core.Pipe('source')),
+              Consumer)
+
+
+def test_outputs_piped_to_the_same_name():
+    """Outputs piped to the same name record each consumer once."""
+    analysis = FlowComponentData.analyze(SameNameFlow)
+    producer, consumer = analysis.children
+
+    assert producer.actual_outputs == {'source': [consumer]}
+    assert producer.get_description().endswith(
+                                        "    first -> source -> Consumer\n"
+                                        "    second -> source -> Consumer\n")
+
+
+def test_nested_flows_keep_only_their_unconnected_inputs(analysis):
+    """Nested flows' own analyses aren't kept, only their inputs' names."""
+    assert analysis is FlowComponentData.analyze(PipedFlow)
+    assert InnerFlow not in FlowComponentData._ANALYSES
+    assert FlowComponentData.get_unconnected_inputs(InnerFlow) == (
+                                                        'Consumer.source',)
+
+
+def test_analyses_cache_is_bounded(monkeypatch):
+    """Only the most recently requested analyses are kept."""
+    monkeypatch.setattr(FlowComponentData, 'ANALYSES_CAPACITY', 1)
+    inner_analysis = FlowComponentData.analyze(InnerFlow)
+    FlowComponentData.analyze(SameNameFlow)
+
+    assert list(FlowComponentData._ANALYSES) == [SameNameFlow]
+    assert FlowComponentData.analyze(InnerFlow) is not inner_analysis
@@ -0,0 +1,128 @@
+"""Tests of the persistent durations cache."""
+import sqlite3
+
+from rotest_tklist import cache as cache_module
+from rotest_tklist.cache import DurationsCache, CacheEntry, open_database
+
+
+STATISTICS = {'min': 1.0, 'avg': 2.0, 'max': 3.0}
+
+
+class Clock(object):
+    """Controllable replacement of time.time."""
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        """Return the current time."""
+        return self.now
+
+
+def make_cache(tmp_path, monkeypatch, **kwargs):
+    """Return a cache in a temporary directory, and its clock."""
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, 'time', clock.time)
+    return DurationsCache(path=str(tmp_path / 'durations.sqlite'),
+                          **kwargs), clock
+
+
+def test_entries_persist(tmp_path, monkeypatch):
+    """Entries are kept on disk, and loaded when the cache is opened."""
+    cache, _ = make_cache(tmp_path, monkeypatch)
+    cache.update({'A.test': (STATISTICS, None),
+                  'B.test': (None, "No test history found!")})
+    reopened = DurationsCache(path=cache.path)
+
+    assert reopened.get('A.test') == CacheEntry(STATISTICS, None, False)
+    assert reopened.get('B.test') == CacheEntry(
+                                    None, "No test history found!", False)
+    assert reopened.get('C.test') is None
+
+
+def test_ttl(tmp_path, monkeypatch):
+    """Statistics and errors become stale after their own TTLs."""
+    cache, clock = make_cache(tmp_path, monkeypatch, ttl=100, error_ttl=10)
+    cache.update({'A.test': (STATISTICS, None),
+                  'B.test': (None, "No test history found!")})
+
+    clock.now += 50
+    assert not cache.get('A.test').stale
+    assert cache.get('B.test').stale
+
+    clock.now += 51
+    assert cache.get('A.test').stale
+
+
+def test_eviction(tmp_path, monkeypatch):
+    """The entries fetched first are evicted, from the disk too."""
+    cache, clock = make_cache(tmp_path, monkeypatch, max_entries=2)
+    for name in ('A.test', 'B.test', 'C.test'):
+        cache.update({name: (STATISTICS, None)})
+        clock.now += 1
+
+    reopened = DurationsCache(path=cache.path)
+    for checked in (cache, reopened):
+        assert checked.get('A.test') is None
+        assert checked.get('C.test') is not None
+
+
+def test_eviction_of_refetched_and_simultaneous_entries(tmp_path,
+                                                        monkeypatch):
+    """Fetching an entry again keeps it, ties are evicted in fetch order."""
+    cache, clock = make_cache(tmp_path, monkeypatch, max_entries=3)
+    cache.update({'A.test': (STATISTICS, None)})
+    clock.now += 1
+    cache.update({'B.test': (STATISTICS, None)})
+    clock.now += 1
+    cache.update({'A.test': (STATISTICS, None)})
+    clock.now += 1
+    cache.update({'C.test': (STATISTICS, None)})
+    cache.update({'D.test': (STATISTICS, None)})
+
+    reopened = DurationsCache(path=cache.path, max_entries=3)
+    for checked in (cache, reopened):
+        assert checked.get('B.test') is None
+        assert [name for name in ('A.test', 'C.test', 'D.test')
+                if checked.get(name) is not None] == ['A.test', 'C.test',
+                                                      'D.test']
+
+    reopened.update({'E.test': (STATISTICS, None)})
+    assert reopened.get('A.test') is None
+    assert DurationsCache(path=cache.path).get('C.test') is not None
+
+
+def test_clear(tmp_path, monkeypatch):
+    """Clearing removes the entries from the disk too."""
+    cache, _ = make_cache(tmp_path, monkeypatch)
+    cache.update({'A.test': (STATISTICS, None)})
+    cache.clear()
+
+    assert cache.get('A.test') is None
+    assert DurationsCache(path=cache.path).get('A.test') is None
+
+
+def test_unavailable_database(tmp_path):
+    """A database that can't be opened leaves the cache in memory."""
+    blocker = tmp_path / 'file'
+    blocker.write_text(u'')
+    connection, rows = open_database(str(blocker / 'db.sqlite'),
+                                     "CREATE TABLE t (a)", "SELECT a FROM t")
+    assert (connection, rows) == (None, [])
+
+    cache = DurationsCache(path=str(blocker / 'durations.sqlite'))
+    cache.update({'A.test': (STATISTICS, None)})
+    assert cache.get('A.test').statistics == STATISTICS
+
+
+def test_failing_database(tmp_path, monkeypatch):
+    """Errors of the database leave the entries in memory."""
+    cache, _ = make_cache(tmp_path, monkeypatch)
+    connection = sqlite3.connect(cache.path)
+    connection.execute("DROP TABLE durations")
+    connection.close()
+
+    cache.update({'A.test': (STATISTICS, None)})
+    assert cache.get('A.test').statistics == STATISTICS
+
+    cache.clear()
+    assert cache.get('A.test') is None
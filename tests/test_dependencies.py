@@ -0,0 +1,195 @@
+"""Tests of the blocks dependencies and parallelism of flows."""
+import io
+import json
+
+import pytest
+from rotest import core
+from rotest.management.base_resource import BaseResource
+
+from rotest_tklist import dependencies
+from rotest_tklist.cache import DurationsCache
+from rotest_tklist.analysis import FlowComponentData
+from rotest_tklist.estimates import DurationEstimator
+from rotest_tklist.dependencies import FlowDependencies, report_dependencies
+
+
+class Block(core.TestBlock):
+    """Block with no inputs."""
+    __test__ = False
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class Device(BaseResource):
+    """Resource requested by the flow."""
+    DATA_CLASS = None
+
+
+class Producer(core.TestBlock):
+    """Block with an output."""
+    __test__ = False
+
+    result = core.BlockOutput()
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class Consumer(core.TestBlock):
+    """Block with an input."""
+    __test__ = False
+
+    source = core.BlockInput()
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class DeviceUser(core.TestBlock):
+    """Block using the flow's resource."""
+    __test__ = False
+
+    device = core.BlockInput()
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class DependentFlow(core.TestFlow):
+    """Flow with piped inputs, a shared resource and a finally block."""
+    __test__ = False
+
+    device = Device.request()
+    blocks = (Producer.params(name='Produce', result=core.Pipe('source')),
+              DeviceUser.params(name='FirstUse'),
+              Consumer.params(name='Consume'),
+              DeviceUser.params(name='SecondUse'),
+              Block.params(name='Cleanup', mode=core.MODE_FINALLY))
+
+
+DURATIONS = {'Produce': 10, 'FirstUse': 30, 'Consume': 5, 'SecondUse': 20,
+             'Cleanup': 1}
+
+
+class SimpleFlow(core.TestFlow):
+    """Flow of two independent blocks."""
+    __test__ = False
+
+    blocks = (Block.params(name='First'), Block.params(name='Second'))
+
+
+class BrokenFlow(core.TestFlow):
+    """Flow containing something that isn't a component."""
+    __test__ = False
+
+    blocks = (object,)
+
+
+@pytest.fixture(name='cache')
+def cache_fixture():
+    """Return an in-memory cache with the blocks' durations."""
+    cache = DurationsCache(path=':memory:')
+    cache.update({name + '.test_method': ({'min': avg, 'avg': avg,
+                                           'max': avg}, None)
+                  for name, avg in DURATIONS.items()})
+    return cache
+
+
+@pytest.fixture(name='flow_dependencies')
+def flow_dependencies_fixture(cache):
+    """Return the dependencies of the dependent flow, with durations."""
+    return FlowDependencies(FlowComponentData.analyze(DependentFlow),
+                            DurationEstimator(cache))
+
+
+@pytest.fixture(name='report')
+def report_fixture(monkeypatch):
+    """Return a function writing the dependencies report to a string.
+
+    The durations are read from an empty in-memory cache.
+    """
+    monkeypatch.setattr(dependencies, 'DurationsCache',
+                        lambda: DurationsCache(path=':memory:'))
+
+    def report(tests, output_format='text'):
+        stream = io.StringIO()
+        exit_code = report_dependencies(tests, output_format, stream)
+        return exit_code, stream.getvalue()
+
+    return report
+
+
+def test_failed_flow_is_reported(report):
+    """A flow failing to be analyzed doesn't stop the others' reports."""
+    exit_code, text = report([BrokenFlow, SimpleFlow])
+
+    assert exit_code == 1
+    assert text.startswith("BrokenFlow: Analysis failed: ")
+    assert "SimpleFlow: 2 components in 1 groups" in text
+
+    exit_code, output = report([BrokenFlow, SimpleFlow], 'json')
+    flows = json.loads(output)["flows"]
+    assert exit_code == 1
+    assert flows[0]["flow"] == 'BrokenFlow' and "error" in flows[0]
+    assert flows[1]["flow"] == 'SimpleFlow'
+    assert report([SimpleFlow])[0] == 0
+
+
+def test_edges(flow_dependencies):
+    """Inputs, the shared resource and finally blocks are dependencies."""
+    finally_reasons = {index: ["finally"] for index in range(4)}
+    assert flow_dependencies.dependencies == [
+        {},
+        {},
+        {0: ["input 'source' of Consume"]},
+        {1: ["resource 'device'"]},
+        finally_reasons]
+
+
+def test_groups_and_critical_path(flow_dependencies):
+    """Independent components are grouped, the longest chain is critical."""
+    assert flow_dependencies.get_groups() == [[0, 1], [2, 3], [4]]
+    assert flow_dependencies.get_critical_path() == ([1, 3, 4], 51)
+
+
+def test_unknown_durations_count_as_nothing():
+    """Components without history take no time on the critical path."""
+    empty = DurationEstimator(DurationsCache(path=':memory:'))
+    flow_dependencies = FlowDependencies(
+                        FlowComponentData.analyze(DependentFlow), empty)
+
+    assert flow_dependencies.durations == [None] * 5
+    assert flow_dependencies.get_critical_path()[1] == 0
+
+
+def test_json_report(flow_dependencies):
+    """The JSON report lists the components, groups and times."""
+    report = flow_dependencies.to_dict()
+
+    assert report["flow"] == 'DependentFlow'
+    assert report["groups"] == [["#0 Produce", "#1 FirstUse"],
+                                ["#2 Consume", "#3 SecondUse"],
+                                ["#4 Cleanup"]]
+    assert report["critical_path"] == ["#1 FirstUse", "#3 SecondUse",
+                                       "#4 Cleanup"]
+    assert report["components"][4]["mode"] == 'Finally'
+    assert report["components"][2]["depends_on"] == [
+        {"component": "#0 Produce",
+         "reasons": ["input 'source' of Consume"]}]
+    assert (report["sequential_time"], report["parallel_time"],
+            report["saving"]) == (66, 51, 15)
+    assert report["unknown_durations"] == 0
+
+
+def test_text_report(flow_dependencies):
+    """The text report shows the edges, groups and times."""
+    assert flow_dependencies.format().splitlines()[:4] == [
+        "DependentFlow: 5 components in 3 groups",
+        "    #2 Consume <- #0 Produce: input 'source' of Consume",
+        "    #3 SecondUse <- #1 FirstUse: resource 'device'",
+        "    #4 Cleanup <- #0 Produce: finally"]
+    assert flow_dependencies.format().splitlines()[-3:] == [
+        "  Group 2: #4 Cleanup",
+        "  Critical path: #1 FirstUse -> #3 SecondUse -> #4 Cleanup",
+        "  Sequential 1.1 min, parallel 0.8 min, saving 0.2 min"]
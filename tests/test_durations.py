@@ -0,0 +1,203 @@
+"""Tests of the durations fetching and prefetching order."""
+import heapq
+import threading
+
+import pytest
+
+from rotest_tklist import durations
+from rotest_tklist.cache import DurationsCache
+from rotest_tklist.durations import (DurationsManager, DurationsFetch,
+                                     DurationsPrefetcher)
+
+
+class HangingClient(object):
+    """Client whose requests never return, until released."""
+    RELEASE = threading.Event()
+
+    def connect(self):
+        """Connect to the server."""
+
+    def get_statistics(self, _):
+        """Wait for the release."""
+        self.RELEASE.wait()
+        return {}
+
+
+class RefusingClient(object):
+    """Client that can't connect to the server."""
+    CONNECTIONS = []
+
+    def connect(self):
+        """Fail connecting."""
+        self.CONNECTIONS.append(self)
+        raise ConnectionRefusedError("Connection refused")
+
+
+class FakeManager(object):
+    """Durations manager collecting a single name per test."""
+    @staticmethod
+    def _collect_components(test, recursive, components):
+        """Collect the test with its class name."""
+        components.append((test, [test.__name__], False))
+
+
+class FakeFetch(object):
+    """Fetch that records its tests, and finishes only when told to."""
+    STARTED = []
+
+    def __init__(self, manager, widget, components, on_finish=None,
+                 on_connection_error=None):
+        self.tests = [test for test, _, _ in components]
+        self.on_finish = on_finish
+        self.on_connection_error = on_connection_error
+        self.cancelled = False
+
+    def start(self):
+        """Register the fetch as started."""
+        self.STARTED.append(self)
+
+    def finish(self):
+        """Complete the fetch."""
+        self.on_finish(self)
+
+    def cancel(self):
+        """Cancel the fetch."""
+        self.cancelled = True
+        self.on_finish(self)
+
+
+def make_manager(client_factory, **attributes):
+    """Return a durations manager class with its own cache and clients."""
+    attributes.update({'CLIENT_FACTORY': client_factory,
+                       '_CACHE': DurationsCache(path=':memory:'),
+                       '_EXECUTOR': None, '_INQUIRER': None,
+                       '_ESTIMATOR': None, '_FETCHES': {}, '_LISTENERS': []})
+    return type('Manager', (DurationsManager,), attributes)
+
+
+def make_tests(count, prefix='Test'):
+    """Return new test classes."""
+    return [type('{}{}'.format(prefix, index), (object,), {})
+            for index in range(count)]
+
+
+def pop_all(prefetcher):
+    """Return the queued tests in their priority order."""
+    heap = list(prefetcher._heap)
+    return [heapq.heappop(heap)[2] for _ in range(len(heap))]
+
+
+@pytest.fixture(name='prefetcher')
+def prefetcher_fixture(monkeypatch, widget):
+    """Return a prefetcher with fake fetches."""
+    FakeFetch.STARTED = []
+    monkeypatch.setattr(durations, 'DurationsFetch', FakeFetch)
+    return DurationsPrefetcher(FakeManager, widget)
+
+
+def test_repeated_hovers_with_busy_fetches(prefetcher):
+    """Hovering tests quickly while the fetches are busy keeps the order."""
+    prefetcher.MAX_FETCHES = 0
+    visible = make_tests(3)
+    hovered = make_tests(3, prefix='Hovered')
+    prefetcher.set_visible(visible)
+    for test in hovered:
+        prefetcher.set_hovered(test)
+
+    queued = [test for test in pop_all(prefetcher)
+              if prefetcher._is_wanted(test)]
+    assert queued == [hovered[-1]] + visible
+
+
+def test_hovered_test_is_fetched_first(prefetcher):
+    """The hovered test is fetched before the visible rows, in order."""
+    prefetcher.MAX_FETCHES = 1
+    prefetcher.BATCH_SIZE = 2
+    visible = make_tests(5)
+    hovered = make_tests(2, prefix='Hovered')
+    prefetcher.set_visible(visible)
+    prefetcher.set_hovered(hovered[0])
+    prefetcher.set_hovered(hovered[1])
+    assert FakeFetch.STARTED[0].tests == visible[:2]
+
+    FakeFetch.STARTED[0].finish()
+    assert FakeFetch.STARTED[1].tests == [hovered[1], visible[2]]
+    FakeFetch.STARTED[1].finish()
+    assert FakeFetch.STARTED[2].tests == visible[3:]
+
+
+def test_scrolling_away_cancels_fetches(prefetcher):
+    """Fetches of tests that aren't visible anymore are cancelled."""
+    prefetcher.MAX_FETCHES = 1
+    first_rows = make_tests(3)
+    second_rows = make_tests(3, prefix='Other')
+    prefetcher.set_visible(first_rows)
+    prefetcher.set_visible(second_rows)
+
+    assert FakeFetch.STARTED[0].cancelled
+    assert FakeFetch.STARTED[1].tests == second_rows
+
+
+def test_fetched_tests_are_not_queued_again(prefetcher):
+    """Tests that were already fetched aren't prefetched again."""
+    tests = make_tests(3)
+    prefetcher.set_visible(tests)
+    FakeFetch.STARTED[0].finish()
+    prefetcher.set_visible(tests)
+
+    assert len(FakeFetch.STARTED) == 1
+
+
+def test_connection_error_stops_prefetching(prefetcher):
+    """A connection error stops the prefetching, without more fetches."""
+    prefetcher.MAX_FETCHES = 1
+    prefetcher.BATCH_SIZE = 1
+    prefetcher.set_visible(make_tests(3))
+    FakeFetch.STARTED[0].on_connection_error(None)
+
+    assert not prefetcher.enabled
+    assert len(FakeFetch.STARTED) == 1
+
+
+def test_requests_behind_a_hung_request_time_out(widget):
+    """Names waiting for a client time out when nothing progresses."""
+    manager = make_manager(HangingClient, POOL_SIZE=1, REQUEST_TIMEOUT=0.2)
+    test = make_tests(1)[0]
+    names = ['Test0.test_{}'.format(index) for index in range(6)]
+    finished = []
+    try:
+        DurationsFetch(manager, widget, [(test, names, True)],
+                       on_finish=finished.append).start()
+        widget.run(limit=3)
+
+    finally:
+        HangingClient.RELEASE.set()
+
+    assert finished
+    assert test._tklist_duration.count("Timed out") == len(names)
+    assert manager.get_cache().get(names[-1]) is None
+
+
+def test_connection_error_stops_before_next_fetch(widget, monkeypatch):
+    """A fetch that can't connect stops the prefetching before finishing."""
+    started = []
+
+    class RecordedFetch(DurationsFetch):
+        """Real fetch, recording that it started."""
+        def start(self):
+            started.append(self)
+            super(RecordedFetch, self).start()
+
+    monkeypatch.setattr(durations, 'DurationsFetch', RecordedFetch)
+    RefusingClient.CONNECTIONS = []
+    manager = make_manager(RefusingClient, POOL_SIZE=1,
+                           _collect_components=FakeManager._collect_components)
+    prefetcher = DurationsPrefetcher(manager, widget)
+    prefetcher.MAX_FETCHES = 1
+    prefetcher.BATCH_SIZE = 1
+    prefetcher.set_visible(make_tests(3))
+    widget.run(limit=1)
+
+    assert not prefetcher.enabled
+    assert len(started) == 1 and started[0].cancelled
+    assert len(RefusingClient.CONNECTIONS) == 1
@@ -0,0 +1,127 @@
+"""Tests of the duration estimates."""
+import pytest
+from rotest import core
+
+from rotest_tklist.cache import DurationsCache
+from rotest_tklist.estimates import (DurationEstimator, Estimate,
+                                     find_names, format_estimate)
+
+
+class Case(core.TestCase):
+    """Case with two methods."""
+    __test__ = False
+
+    def test_first(self):
+        """First method."""
+
+    def test_second(self):
+        """Second method."""
+
+
+class Block(core.TestBlock):
+    """Block with no inputs."""
+    __test__ = False
+
+    def test_method(self):
+        """Run the block."""
+
+
+Setup = Block.params(name='Setup', mode=core.MODE_OPTIONAL)
+Main = Block.params(name='Main', mode=core.MODE_CRITICAL)
+Check = Block.params(name='Check', mode=core.MODE_OPTIONAL)
+Teardown = Block.params(name='Teardown', mode=core.MODE_FINALLY)
+
+
+class Flow(core.TestFlow):
+    """Flow with blocks of all the modes."""
+    __test__ = False
+
+    blocks = (Setup, Main, Check, Teardown)
+
+
+class OuterFlow(core.TestFlow):
+    """Flow containing another flow."""
+    __test__ = False
+
+    blocks = (Flow, Check)
+
+
+def statistics(avg):
+    """Return statistics around an average duration."""
+    return {'min': avg / 2.0, 'avg': avg, 'max': avg * 2.0}
+
+
+@pytest.fixture(name='cache')
+def cache_fixture():
+    """Return an in-memory durations cache."""
+    return DurationsCache(path=':memory:')
+
+
+def test_case_sums_its_methods(cache):
+    """Cases are estimated by their methods, counting missing ones."""
+    cache.update({'Case.test_first': (statistics(10), None)})
+    estimate = DurationEstimator(cache).estimate(Case)
+
+    assert estimate == Estimate(min=5, avg=10, max=20, known=1, missing=1)
+    assert format_estimate(estimate) == "~0.2 min"
+
+
+def test_errors_are_not_estimated(cache):
+    """Names with errors are counted as missing."""
+    cache.update({'Case.test_first': (None, "No test history found!")})
+    estimate = DurationEstimator(cache).estimate(Case)
+
+    assert (estimate.known, estimate.missing) == (0, 2)
+    assert format_estimate(estimate) == ""
+
+
+def test_flow_rolls_up_its_blocks(cache):
+    """The minimum stops at the first critical block, except finally."""
+    cache.update({name + '.test_method': (statistics(avg), None)
+                  for name, avg in (('Setup', 10), ('Main', 20),
+                                    ('Check', 30), ('Teardown', 40))})
+    estimate = DurationEstimator(cache).estimate(Flow)
+
+    assert estimate.avg == 100
+    assert estimate.max == 200
+    assert estimate.min == (10 + 20 + 40) / 2.0
+    assert (estimate.known, estimate.missing) == (4, 0)
+
+
+def test_flow_history_is_preferred(cache):
+    """Flows with their own statistics aren't rolled up."""
+    cache.update({'Flow': (statistics(7), None),
+                  'Setup.test_method': (statistics(100), None)})
+
+    assert DurationEstimator(cache).estimate(Flow).avg == 7
+
+
+def test_invalidate_updates_ancestors_only(cache):
+    """Changed names forget their tests and the flows containing them."""
+    cache.update({'Main.test_method': (statistics(20), None)})
+    estimator = DurationEstimator(cache)
+    assert estimator.estimate(OuterFlow).avg == 20
+    case_estimate = estimator.estimate(Case)
+
+    cache.update({'Main.test_method': (statistics(50), None)})
+    assert estimator.estimate(OuterFlow).avg == 20  # Still memoized
+
+    estimator.invalidate(['Main.test_method'])
+    assert estimator.estimate(Flow).avg == 50
+    assert estimator.estimate(OuterFlow).avg == 50
+    assert estimator.estimate(Case) is case_estimate
+
+
+def test_names_found_in_advance(cache):
+    """Names found in advance don't change the estimator until added."""
+    cache.update({'Case.test_second': (statistics(4), None)})
+    estimator = DurationEstimator(cache)
+    names = find_names([Case, Flow])
+    assert names[Case] == ['Case.test_first', 'Case.test_second']
+
+    estimator.add_names(names)
+    assert estimator.estimate(Case).avg == 4
+
+    cache.update({'Case.test_first': (statistics(2), None)})
+    estimator.invalidate(['Case.test_first'])
+    assert estimator.estimate(Case).avg == 6
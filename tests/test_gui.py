@@ -0,0 +1,130 @@
+"""Tests of the explorer's background work, without a display."""
+from rotest import core
+
+from rotest_tklist import gui
+from rotest_tklist.gui import (SuiteValidator, FlowsAnalyzer,
+                               BackgroundTask, BackgroundStream)
+
+
+class ValidCase(core.TestCase):
+    """Valid case."""
+    __test__ = False
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class BrokenCase(core.TestCase):
+    """Case failing to be constructed."""
+    __test__ = False
+
+    def __init__(self, *args, **kwargs):
+        raise ValueError("Broken case")
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class InputBlock(core.TestBlock):
+    """Block with a single input."""
+    __test__ = False
+
+    value = core.BlockInput()
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class ConnectedFlow(core.TestFlow):
+    """Flow providing its block's input."""
+    __test__ = False
+
+    common = {'value': 1}
+    blocks = (InputBlock,)
+
+
+class UnconnectedFlow(core.TestFlow):
+    """Flow leaving its block's input unconnected."""
+    __test__ = False
+
+    blocks = (InputBlock,)
+
+
+def test_validation_errors_are_reported(widget):
+    """Any construction error is the test's error, and validation goes on."""
+    errors = {}
+    progress = []
+    SuiteValidator(widget, [ValidCase, BrokenCase, ValidCase],
+                   on_error=errors.__setitem__,
+                   on_progress=progress.append).start()
+
+    assert widget.run()
+    assert errors == {BrokenCase: "Broken case"}
+    assert progress[-1] == 3
+
+
+def test_validation_stops_polling_when_closed(widget):
+    """The results polling stops once the window is closed."""
+    def on_progress(_):
+        assert widget.exists, "Called after the window was closed"
+
+    SuiteValidator(widget, [ValidCase] * 50, on_error=None,
+                   on_progress=on_progress).start()
+    widget.exists = False
+
+    assert widget.run()
+
+
+def test_flows_analysis_results(widget):
+    """Each flow's analysis summary is reported, in the flows' order."""
+    summaries = []
+    analyzer = FlowsAnalyzer(widget, [ConnectedFlow, UnconnectedFlow],
+                             on_result=lambda flow, summary:
+                             summaries.append((flow, summary)))
+    analyzer.start()
+
+    assert widget.run()
+    assert analyzer.analyzed == 2
+    flows = [flow for flow, _ in summaries]
+    assert flows == [ConnectedFlow, UnconnectedFlow]
+    assert not summaries[0][1]['unconnected_inputs']
+    assert summaries[1][1]['unconnected_inputs'] == ['InputBlock.value']
+
+
+def test_background_task_result(widget):
+    """The function's result is handed to the callback."""
+    results = []
+    BackgroundTask(widget, lambda: 42, results.append).start()
+
+    assert widget.run()
+    assert results == [42]
+
+
+def test_failed_producer_stops_polling(widget):
+    """A failing producer stops the polling, after its results."""
+    def produce():
+        yield 1
+        raise RuntimeError("Producer failed")
+
+    batches = []
+    BackgroundStream(widget, produce, batches.append).start()
+
+    assert widget.run()
+    assert batches == [[1]]
+
+
+def test_descriptions_cache_is_bounded(monkeypatch):
+    """Only the most recently shown descriptions are kept."""
+    monkeypatch.setattr(gui, 'DESCRIPTIONS_CAPACITY', 2)
+    monkeypatch.setattr(gui, '_DESCRIPTIONS', gui.OrderedDict())
+    created = []
+
+    def describe(item):
+        return gui._get_cached_description(
+                                item, ValidCase, lambda: created.append(item))
+
+    for item in ('first', 'second', 'first', 'third', 'first', 'second'):
+        describe(item)
+
+    assert created == ['first', 'second', 'third', 'second']
+    assert list(gui._DESCRIPTIONS) == ['first', 'second']
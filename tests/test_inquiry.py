@@ -0,0 +1,48 @@
+"""Tests of the statistics inquiries."""
+from rotest_tklist.inquiry import (ClientPool, StatisticsInquirer,
+                                   RequestError, NO_HISTORY_ERROR)
+
+
+class FakeClient(object):
+    """Client answering by name: known names, no history or a reset."""
+    STATISTICS = {'min': 1.0, 'avg': 2.0, 'max': 3.0}
+
+    def connect(self):
+        """Connect to the server."""
+
+    def get_statistics(self, name):
+        """Return the statistics of a name."""
+        if name.startswith('reset'):
+            raise ConnectionResetError("Connection reset by peer")
+
+        if name.startswith('new'):
+            raise RuntimeError(NO_HISTORY_ERROR)
+
+        return self.STATISTICS
+
+
+def inquire(names):
+    """Inquire names, and return name -> (statistics, error)."""
+    results = {}
+    inquirer = StatisticsInquirer(ClientPool(1, FakeClient))
+    inquirer.inquire(names, on_result=lambda name, statistics, error:
+                     results.update({name: (statistics, error)}))
+    return results
+
+
+def test_split_removes_repeats():
+    """Repeating names are inquired once, spread over the clients."""
+    inquirer = StatisticsInquirer(ClientPool(2, FakeClient), batch_size=3)
+    assert inquirer.split(['a', 'b', 'a', 'c', 'd']) == [['a', 'b'],
+                                                         ['c', 'd']]
+
+
+def test_answers_and_request_errors():
+    """Server answers are kept as is, failed requests are RequestErrors."""
+    results = inquire(['known', 'new', 'reset'])
+
+    assert results['known'] == (FakeClient.STATISTICS, None)
+    statistics, error = results['new']
+    assert statistics is None and isinstance(error, RuntimeError)
+    statistics, error = results['reset']
+    assert statistics is None and isinstance(error, RequestError)
@@ -0,0 +1,88 @@
+"""Tests of the phases timings and counters."""
+import os
+import json
+import pstats
+import signal
+import threading
+
+import pytest
+
+from rotest_tklist.profiling import Timings, profile
+
+
+def test_reentered_span_is_counted_once():
+    """A span entered again in the same thread is part of the outer one."""
+    timings = Timings()
+    with timings.span("analysis"):
+        with timings.span("analysis"):
+            pass
+
+        with timings.span("reload"):
+            pass
+
+    assert timings.spans["analysis"][0] == 1
+    assert timings.spans["reload"][0] == 1
+
+
+def test_spans_of_threads_are_separate():
+    """Spans of the same phase in different threads are all counted."""
+    timings = Timings()
+    entered = threading.Barrier(2)
+
+    def run():
+        with timings.span("fetch"):
+            entered.wait()
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert timings.spans["fetch"][0] == 2
+
+
+def test_counters_and_reset():
+    """Counters accumulate, and reset forgets them with the spans."""
+    timings = Timings()
+    timings.count("cache hits")
+    timings.count("cache hits", 4)
+    timings.add_span("analysis", 0.5)
+
+    report = timings.to_dict()
+    assert report["counters"] == {"cache hits": 5}
+    assert report["spans"] == {"analysis": {"count": 1, "total": 0.5}}
+    assert "cache hits: 5" in timings.format_status()
+
+    timings.reset()
+    assert timings.to_dict()["spans"] == timings.to_dict()["counters"] == {}
+
+
+@pytest.mark.skipif(not hasattr(os, 'register_at_fork'),
+                    reason="Forking hooks aren't available")
+def test_forked_child_gets_a_released_lock():
+    """A child forked while the lock is held can still record timings."""
+    timings = Timings()
+    with timings._lock:
+        pid = os.fork()
+        if pid == 0:  # The child, killed if it hangs on the lock
+            signal.alarm(5)
+            timings.count("forked")
+            os._exit(0)
+
+    _, status = os.waitpid(pid, 0)
+    assert status == 0
+
+
+def test_profile_writes_files(tmp_path):
+    """The timings and the profile are written on exit."""
+    timings_path = str(tmp_path / "timings.json")
+    profile_path = str(tmp_path / "profile.stats")
+    with profile(timings_path, profile_path) as timings:
+        timings.count("profiled")
+
+    with open(timings_path) as timings_file:
+        assert json.load(timings_file)["counters"]["profiled"] >= 1
+
+    assert pstats.Stats(profile_path).total_calls > 0
@@ -0,0 +1,120 @@
+"""Tests of the headless connectivity report."""
+import io
+import json
+import threading
+
+from rotest import core
+
+from rotest_tklist import report
+
+
+class InputBlock(core.TestBlock):
+    """Block with a single input."""
+    __test__ = False
+
+    value = core.BlockInput()
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class ConnectedFlow(core.TestFlow):
+    """Flow providing its block's input."""
+    __test__ = False
+
+    common = {'value': 1}
+    blocks = (InputBlock,)
+
+
+class UnconnectedFlow(core.TestFlow):
+    """Flow leaving its block's input unconnected."""
+    __test__ = False
+
+    blocks = (InputBlock,)
+
+
+class BrokenFlow(core.TestFlow):
+    """Flow containing something that isn't a component."""
+    __test__ = False
+
+    blocks = (object,)
+
+
+def test_analyze_flow():
+    """The summary has the unconnected inputs and the errors' paths."""
+    assert report.analyze_flow(ConnectedFlow) == {
+        "flow": 'ConnectedFlow', "module": __name__,
+        "unconnected_inputs": [], "errors": []}
+
+    summary = report.analyze_flow(UnconnectedFlow)
+    assert summary["unconnected_inputs"] == ['InputBlock.value']
+    assert summary["errors"] == [
+        {"component": 'UnconnectedFlow.InputBlock',
+         "error": "Input 'value' is not connected!"}]
+
+
+def test_failed_analysis_is_an_error():
+    """An exception analyzing a flow is reported as the flow's error."""
+    summary = report.analyze_flow(BrokenFlow)
+
+    assert summary["unconnected_inputs"] == []
+    assert [error["component"] for error in summary["errors"]] == [
+        'BrokenFlow']
+    assert summary["errors"][0]["error"].startswith("Analysis failed: ")
+
+
+def test_sequential_analyses():
+    """With one process, the summaries are yielded in the flows' order."""
+    summaries = report.iterate_analyses([UnconnectedFlow, ConnectedFlow],
+                                        processes=1)
+
+    assert [summary["flow"] for summary in summaries] == [
+        'UnconnectedFlow', 'ConnectedFlow']
+
+
+def test_text_report_and_exit_code():
+    """Only flows with errors are listed, the exit code tells if any."""
+    stream = io.StringIO()
+    tests = [ConnectedFlow, InputBlock, UnconnectedFlow]
+    assert report.report_flows(tests, processes=1, stream=stream) == 1
+    assert stream.getvalue() == (
+        "UnconnectedFlow ({}): 1 errors\n"
+        "    UnconnectedFlow.InputBlock: Input 'value' is not connected!\n"
+        "2 flows analyzed, 1 with errors\n".format(__name__))
+
+    stream = io.StringIO()
+    assert report.report_flows([ConnectedFlow], processes=1,
+                               stream=stream) == 0
+    assert stream.getvalue() == "1 flows analyzed, 0 with errors\n"
+
+
+def test_json_report():
+    """The JSON report has all the flows' summaries and the totals."""
+    stream = io.StringIO()
+    exit_code = report.report_flows([ConnectedFlow, BrokenFlow], 'json',
+                                    processes=1, stream=stream)
+    output = json.loads(stream.getvalue())
+
+    assert exit_code == 1
+    assert (output["total"], output["failed"]) == (2, 1)
+    assert [summary["flow"] for summary in output["flows"]] == [
+        'ConnectedFlow', 'BrokenFlow']
+
+
+def test_no_fork_while_threads_run(monkeypatch):
+    """Flows are analyzed in the current process while other threads run."""
+    monkeypatch.setattr(report.multiprocessing, 'get_context', None)
+    release = threading.Event()
+    thread = threading.Thread(target=release.wait)
+    thread.start()
+    try:
+        assert not report._can_fork()
+        summaries = report.analyze_flows([ConnectedFlow, UnconnectedFlow],
+                                         processes=4)
+
+    finally:
+        release.set()
+        thread.join()
+
+    assert [summary["flow"] for summary in summaries] == ['ConnectedFlow',
+                                                          'UnconnectedFlow']
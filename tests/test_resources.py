@@ -0,0 +1,135 @@
+"""Tests of the resources demand of the tests."""
+import io
+import json
+
+from rotest import core
+from rotest.management.base_resource import BaseResource
+
+from rotest_tklist.resources import (ResourceIndex, get_test_requests,
+                                     report_resources)
+
+
+class Device(BaseResource):
+    """Resource requested with different kwargs."""
+    DATA_CLASS = None
+
+
+class Server(BaseResource):
+    """Resource requested without kwargs."""
+    DATA_CLASS = None
+
+
+class DeviceCase(core.TestCase):
+    """Case requesting both types."""
+    __test__ = False
+
+    device = Device.request(index=1)
+    server = Server.request()
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class OtherDeviceCase(core.TestCase):
+    """Case requesting a device like the first case."""
+    __test__ = False
+
+    device = Device.request(index=1)
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class ServerBlock(core.TestBlock):
+    """Block requesting a server."""
+    __test__ = False
+
+    server = Server.request()
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class DeviceBlock(core.TestBlock):
+    """Block requesting a device of the same name as its flow's."""
+    __test__ = False
+
+    device = Device.request(index=3)
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class InnerFlow(core.TestFlow):
+    """Flow whose blocks request resources."""
+    __test__ = False
+
+    blocks = (ServerBlock, DeviceBlock)
+
+
+class DeviceFlow(core.TestFlow):
+    """Flow requesting a device, containing a nested flow twice."""
+    __test__ = False
+
+    device = Device.request(index=2)
+    blocks = (InnerFlow, ServerBlock, InnerFlow)
+
+
+def describe(requests):
+    """Return the names, types and kwargs of requests."""
+    return sorted((request.name, request.type.__name__, request.kwargs)
+                  for request in requests)
+
+
+def test_nested_requests_by_name():
+    """Nested blocks' requests are included, once for each name."""
+    assert describe(get_test_requests(DeviceCase)) == [
+        ('device', 'Device', {'index': 1}),
+        ('server', 'Server', {})]
+    assert describe(get_test_requests(DeviceFlow)) == [
+        ('device', 'Device', {'index': 2}),
+        ('server', 'Server', {})]
+
+
+def test_index_demands():
+    """The demands count the cases, flows and requests of each type."""
+    index = ResourceIndex([DeviceCase, OtherDeviceCase, DeviceFlow])
+    assert list(index.demands) == ['Device', 'Server']
+
+    device = index.demands['Device']
+    assert device.cases == [DeviceCase, OtherDeviceCase]
+    assert device.flows == [DeviceFlow]
+    assert device.requests == 3
+    assert device.variants == {"(index=1)": [DeviceCase, OtherDeviceCase],
+                               "(index=2)": [DeviceFlow]}
+
+    server = index.demands['Server']
+    assert (server.cases, server.flows) == ([DeviceCase], [DeviceFlow])
+    assert server.variants == {"()": [DeviceCase, DeviceFlow]}
+
+
+def test_text_report():
+    """The text report lists the types by demand, with their kwargs."""
+    stream = io.StringIO()
+    assert report_resources([DeviceCase, OtherDeviceCase, DeviceFlow],
+                            stream=stream) == 0
+    assert stream.getvalue() == (
+        "Device: 2 cases, 1 flows, 3 requests\n"
+        "    (index=1): 2 tests\n"
+        "    (index=2): 1 tests\n"
+        "Server: 1 cases, 1 flows, 2 requests\n"
+        "    (): 2 tests\n"
+        "2 resource types requested by 3 tests\n")
+
+
+def test_json_report():
+    """The JSON report has the demands and the requesting tests' names."""
+    stream = io.StringIO()
+    report_resources([DeviceCase, DeviceFlow], 'json', stream)
+    output = json.loads(stream.getvalue())
+
+    assert output["tests"] == 2
+    assert output["resources"][0] == {
+        "type": 'Device', "cases": 1, "flows": 1, "requests": 2,
+        "variants": [{"kwargs": "(index=1)", "tests": ['DeviceCase']},
+                     {"kwargs": "(index=2)", "tests": ['DeviceFlow']}]}
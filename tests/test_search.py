@@ -0,0 +1,109 @@
+"""Tests of the search index and its query grammar."""
+import pytest
+
+from rotest_tklist.search import TestsIndex
+
+
+def make_test(name, tags=()):
+    """Return a new test class, with tags."""
+    return type(name, (object,), {'TAGS': list(tags)})
+
+
+LOGIN = make_test('LoginCase', ['Smoke', 'auth'])
+LOGOUT = make_test('LogoutCase', ['auth'])
+UPLOAD = make_test('UploadFlow', ['Slow', 'storage'])
+DOWNLOAD = make_test('DownloadFlow', ['storage'])
+TESTS = [LOGIN, LOGOUT, UPLOAD, DOWNLOAD]
+
+
+@pytest.fixture(name='index')
+def index_fixture():
+    """Return an index of the tests, with their resources."""
+    index = TestsIndex(TESTS)
+    index.add_resources({LOGIN: ['WebServer'], UPLOAD: ['FileServer'],
+                         DOWNLOAD: ['FileServer', 'Client']})
+    return index
+
+
+@pytest.mark.parametrize('query, expected', [
+    ("", TESTS),
+    ("login", [LOGIN]),
+    ("LOGIN", [LOGIN]),
+    ("case", [LOGIN, LOGOUT]),
+    ("server", [LOGIN, UPLOAD, DOWNLOAD]),
+    ("name:server", []),
+    ("tag:auth", [LOGIN, LOGOUT]),
+    ("res:client", [DOWNLOAD]),
+    ("log*", [LOGIN, LOGOUT]),
+    ("tag:s*", [LOGIN, UPLOAD, DOWNLOAD]),
+    ("*flow", [UPLOAD, DOWNLOAD]),
+    ("log?utcase", [LOGOUT]),
+    ("res:[fw]*", [LOGIN, UPLOAD, DOWNLOAD]),
+])
+def test_terms(index, query, expected):
+    """Terms match names, tags and resources, by substrings or wildcards."""
+    assert index.search(query) == expected
+
+
+@pytest.mark.parametrize('query, expected', [
+    ("storage fileserver", [UPLOAD, DOWNLOAD]),
+    ("storage and client", [DOWNLOAD]),
+    ("smoke or slow", [LOGIN, UPLOAD]),
+    ("not tag:auth", [UPLOAD, DOWNLOAD]),
+    ("not not smoke", [LOGIN]),
+    ("smoke or storage client", [LOGIN, DOWNLOAD]),
+    ("(smoke or storage) server", [LOGIN, UPLOAD, DOWNLOAD]),
+    ("(smoke or storage) and not (slow)", [LOGIN, DOWNLOAD]),
+])
+def test_operators(index, query, expected):
+    """And binds tighter than or, and parentheses group terms."""
+    assert index.search(query) == expected
+
+
+@pytest.mark.parametrize('query', [
+    "smoke and", "or smoke", "(smoke", "smoke)", "()", "not",
+    "kind:smoke", "is:broken",
+])
+def test_invalid_queries(index, query):
+    """Malformed queries and unknown fields or states are errors."""
+    with pytest.raises(ValueError):
+        index.search(query)
+
+
+def test_states(index, monkeypatch):
+    """The states are indexed again when the tests are updated."""
+    assert index.search("is:error or is:timed") == []
+
+    monkeypatch.setattr(UPLOAD, '_tklist_flow_errors', ["Input 'file' is "
+                                                        "not connected!"],
+                        raising=False)
+    monkeypatch.setattr(DOWNLOAD, '_tklist_duration', "~1.0 min",
+                        raising=False)
+    index.update(UPLOAD)
+    index.update(DOWNLOAD)
+    assert index.search("is:error") == [UPLOAD]
+    assert index.search("is:timed") == [DOWNLOAD]
+
+    monkeypatch.undo()
+    index.update(UPLOAD)
+    assert index.search("is:error") == []
+
+
+def test_added_resources_are_matched():
+    """Resources indexed after a search are matched by later searches."""
+    index = TestsIndex(TESTS)
+    assert index.search("res:client") == []
+
+    index.add_resources({LOGOUT: ['Client']})
+    assert index.search("res:client") == [LOGOUT]
+
+
+def test_replace(index):
+    """A replaced test is found by its new class, in the same position."""
+    new_login = make_test('LoginCase', ['Nightly'])
+    index.replace(LOGIN, new_login, ['Client'])
+
+    assert index.search("nightly") == [new_login]
+    assert index.search("smoke") == []
+    assert index.search("res:client") == [new_login, DOWNLOAD]
+    assert index.search("") == [new_login, LOGOUT, UPLOAD, DOWNLOAD]
@@ -0,0 +1,61 @@
+"""Tests of the persistent analysis snapshot."""
+import sys
+import importlib
+
+import pytest
+
+from rotest_tklist.snapshot import AnalysisSnapshot
+
+
+MODULE_SOURCE = u"""
+from rotest.core import TestCase
+
+
+class SnapshotCase(TestCase):
+    def test_method(self):
+        pass
+"""
+
+
+@pytest.fixture(name='module')
+def module_fixture(tmp_path, monkeypatch):
+    """Return a tests module with a file that can be changed."""
+    (tmp_path / 'snapshot_tests.py').write_text(MODULE_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module('snapshot_tests')
+    yield module
+    sys.modules.pop('snapshot_tests', None)
+
+
+def test_unchanged_modules_are_loaded(tmp_path, module):
+    """Flushed results are loaded while the test's module didn't change."""
+    path = str(tmp_path / 'snapshot.sqlite')
+    snapshot = AnalysisSnapshot(path)
+    snapshot.update(module.SnapshotCase, 'validation', None)
+    snapshot.update(module.SnapshotCase, 'resource_types', ['Device'])
+    snapshot.flush()
+
+    assert AnalysisSnapshot(path).load([module.SnapshotCase]) == {
+        module.SnapshotCase: {'validation': None,
+                              'resource_types': ['Device']}}
+
+
+def test_changed_modules_are_invalidated(tmp_path, module):
+    """Results of tests whose modules changed aren't loaded."""
+    path = str(tmp_path / 'snapshot.sqlite')
+    snapshot = AnalysisSnapshot(path)
+    snapshot.update(module.SnapshotCase, 'validation', "Error")
+    snapshot.flush()
+
+    with open(module.__file__, 'a') as module_file:
+        module_file.write(u"# Changed\n")
+
+    assert AnalysisSnapshot(path).load([module.SnapshotCase]) == {}
+
+
+def test_unflushed_results_are_not_kept(tmp_path, module):
+    """Results are written to the disk only when flushed."""
+    path = str(tmp_path / 'snapshot.sqlite')
+    AnalysisSnapshot(path).update(module.SnapshotCase, 'validation', None)
+
+    assert AnalysisSnapshot(path).load([module.SnapshotCase]) == {}
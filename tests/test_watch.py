@@ -0,0 +1,43 @@
+"""Tests of the tests modules watching."""
+from rotest import core
+
+from rotest_tklist.watch import DependencyIndex, _is_watchable
+
+
+class Block(core.TestBlock):
+    """Block defined in this module."""
+    __test__ = False
+
+    def test_method(self):
+        """Do nothing."""
+
+
+class Flow(core.TestFlow):
+    """Flow of a parametrized block."""
+    __test__ = False
+
+    blocks = (Block.params(name='Named'),)
+
+
+def test_library_modules_are_not_watched():
+    """Only the modules outside the libraries and rotest are watched."""
+    assert _is_watchable(__name__)
+    assert not _is_watchable('unittest.case')
+    assert not _is_watchable('json')
+    assert not _is_watchable('rotest.core.flow')
+    assert not _is_watchable('builtins')
+    assert not _is_watchable('no_such_module')
+
+
+def test_index_modules():
+    """The index tracks only the modules of the user's components."""
+    assert DependencyIndex([Flow]).get_modules() == [__name__]
+
+
+def test_affected_components():
+    """Changing a module affects its components and the flows above."""
+    index = DependencyIndex([Flow])
+    affected = index.get_affected([__name__])
+
+    assert set(affected) == {Flow, Flow.blocks[0]}
+    assert affected.index(Flow.blocks[0]) < affected.index(Flow)